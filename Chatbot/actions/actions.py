@@ -19,13 +19,22 @@ Il modulo espone le action Rasa:
 
 from __future__ import annotations
 
+import heapq
+import itertools
 import json
 import os
 import re
 import sqlite3
+import string
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple, Text, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Text
 
+import numpy as np
 from rasa_sdk import Action, Tracker
 from rasa_sdk.events import FollowupAction, SlotSet
 from rasa_sdk.executor import CollectingDispatcher
@@ -37,6 +46,68 @@ from rasa_sdk.executor import CollectingDispatcher
 # Percorso del database SQLite utilizzato da tutte le query.
 DB_PATH = os.getenv("TENNISBOT_DB", "tennisbot.db")
 
+# PRAGMA applicati all'apertura di ogni connessione del pool (WAL + cache in memoria).
+DB_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    # Aggiorna le statistiche del planner solo se mancano o sono obsolete (es. nuovi indici).
+    "PRAGMA optimize=0x10002",
+    # Le action eseguono solo SELECT: da qui in poi la connessione rifiuta qualsiasi scrittura.
+    # Deve restare l'ultimo PRAGMA, perché journal_mode e optimize possono scrivere nel file.
+    "PRAGMA query_only=1",
+)
+
+# Statement preparati tenuti in cache per connessione (il default di sqlite3 è 128).
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Tabelle FTS5 (tokenizer trigram) create da db_create.py per i suggerimenti fuzzy.
+FTS_TABLES = {
+    ("players", "player_name"): "players_fts",
+    ("matches", "tourney_name"): "tournaments_fts",
+}
+# Tabelle FTS5 (tokenizer unicode61, accenti ignorati) per la ricerca per prefisso di parola.
+FTS_TOKEN_TABLES = {
+    ("players", "player_name"): "players_name_fts",
+    ("matches", "tourney_name"): "tournaments_name_fts",
+}
+# Numero di candidati FTS5 su cui applicare il ranking difflib.
+FTS_SHORTLIST_SIZE = 50
+
+# Pool minimale: una connessione riutilizzata per ogni thread dell'action server.
+_db_local = threading.local()
+
+# Cache id -> nome giocatore. db_create.py aggiorna players (e il flag active) sul DB in uso:
+# si assume solo che il nome di un id già presente non cambi, quindi si memorizzano i nomi
+# trovati e mai gli id mancanti né i flag.
+_player_name_cache: Dict[str, str] = {}
+
+# Cache dei nomi digitati dall'utente: risoluzione giocatore e suggerimenti fuzzy.
+# Le chiavi ignorano le maiuscole ASCII come LIKE/LOWER di SQLite; le cache sono limitate.
+LOOKUP_CACHE_SIZE = 4096
+_ASCII_LOWER_TABLE = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+_player_lookup_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+_similar_names_cache: Dict[Tuple[str, str, str, int], Tuple[str, ...]] = {}
+
+# Statistiche aggregate per (giocatore, anno, superficie, torneo). Scadono dopo un TTL perché
+# db_create.py aggiorna periodicamente i match in corso sullo stesso DB.
+PLAYER_STATS_CACHE_TTL = 600.0
+_player_stats_cache: Dict[Tuple[Any, ...], Tuple[float, Dict[str, Any]]] = {}
+
+# Cache nome torneo minuscolo -> nome canonico, caricata alla prima ricerca di un torneo nel testo.
+_tournament_names_cache: Dict[str, str] = {}
+
+# Coppie (nome torneo in minuscolo ASCII, nome canonico) ordinate per numero di match. Riletta
+# dopo PLAYER_STATS_CACHE_TTL secondi: db_create.py aggiunge i tornei in corso sullo stesso DB.
+_tournament_ranking_cache: List[Tuple[str, str]] = []
+_tournament_ranking_loaded_at = 0.0
+
+# Valori distinti di (tabella, colonna) per il ranking fuzzy quando manca l'indice FTS5, con
+# l'istante di caricamento: riletti dopo PLAYER_STATS_CACHE_TTL secondi come la classifica tornei.
+_distinct_names_cache: Dict[Tuple[str, str], Tuple[float, Tuple[str, ...]]] = {}
+
 
 # Mappa i codici ATP alle etichette leggibili in italiano.
 SURFACE_LABELS = {
@@ -62,28 +133,63 @@ SURFACE_KEYWORDS = {
 }
 
 # Set di codici superficie ammessi dal DB.
-VALID_SURFACE_CODES = set(SURFACE_LABELS.keys())
+VALID_SURFACE_CODES = frozenset(SURFACE_LABELS)
 # Slot tecnico per ricordare quale action è stata eseguita prima di un filtro.
 LAST_CONTEXT_SLOT = "last_context_action"
+# Action ignorate cercando nella cronologia l'ultima richiesta a cui applicare un filtro.
+FILTER_IGNORED_ACTIONS = frozenset(
+    {
+        "action_listen",
+        "action_apply_filters",
+        "action_default_fallback",
+        "action_reset_slots",
+        "action_session_start",
+        "action_extract_slots",
+    }
+)
+# Action a cui ActionApplyFilters può reindirizzare i filtri.
+FILTERABLE_ACTIONS = frozenset({"action_player_stats", "action_head_to_head", "action_match_result"})
+# Slot della conversazione azzerati da ActionResetSlots.
+CONVERSATION_SLOTS = ("player_name", "player1", "player2", "tournament_name", "year", "surface", LAST_CONTEXT_SLOT)
+# Attributo con cui il FilterContext già calcolato viene memorizzato sul tracker.
+FILTER_CONTEXT_CACHE_ATTR = "_tennisbot_filter_context"
+
+# Espressioni regolari compilate una sola volta all'import del modulo.
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+_YEAR_ANY_RE = re.compile(r"(19|20)\d{2}")
+_CHI_E_RE = re.compile(r"(?i)^\s*chi\s*(?:\u00E8|e'|e)\s+(.+)$")
+_WHO_IS_RE = re.compile(r"(?i)^\s*who\s+is\s+(.+)$")
+_TRAIL_PUNCT_RE = re.compile(r"[\?\!\.,]+$")
+_TOKEN_RE = re.compile(r"[A-Za-zÀ-ÖØ-öø-ÿ']+")
+_WORD_RE = re.compile(r"\w+")
+# Usate da ActionMatchResult per ripulire i frammenti di nome e separare "X vs Y".
+_NAME_CLEAN_RE = re.compile(r"[^A-Za-zÀ-ÖØ-öø-ÿ' -]")
+_VS_SPLIT_RE = re.compile(r"(?i)(.+?)\s+(?:vs\.?|versus|contro)\s+(.+)")
+# Alternanza unica dei sinonimi di superficie, dal più lungo ("terra battuta" prima di "terra").
+_SURFACE_RE = re.compile("|".join(sorted(map(re.escape, SURFACE_KEYWORDS), key=len, reverse=True)))
+
+
+def event_field(event: Any, key: Text) -> Any:
+    """Legge un campo di un evento del tracker: dict (come li consegna rasa_sdk) oppure oggetto."""
+    if isinstance(event, dict):
+        return event.get(key)
+    return getattr(event, key, None)
 
 
 def action_ran_after_latest_user(tracker: Tracker, action_name: Text) -> bool:
     """Restituisce True se l'action indicata è già stata eseguita dopo l'ultimo messaggio utente."""
-    events = getattr(tracker, "events", None)
+    events = tracker.events
     if not events:
         return False
 
-    last_user_index: Optional[int] = None
-    for idx, event in enumerate(events):
-        if getattr(event, "event", None) == "user":
-            last_user_index = idx
-
-    if last_user_index is None or last_user_index == len(events) - 1:
-        return False
-
-    for event in events[last_user_index + 1 :]:
-        if getattr(event, "event", None) == "action" and getattr(event, "name", None) == action_name:
-            return True
+    # Un'unica scansione all'indietro che si ferma al primo messaggio utente incontrato.
+    found = False
+    for event in reversed(events):
+        event_type = event_field(event, "event")
+        if event_type == "user":
+            return found
+        if event_type == "action" and event_field(event, "name") == action_name:
+            found = True
 
     return False
 
@@ -100,13 +206,101 @@ def describe_filters(year: Optional[str], surface: Optional[str], tournament: Op
     return parts
 
 
+def filter_header_lines(filters_desc: Sequence[str]) -> List[str]:
+    """Riga "Filtri attivi: ..." da inserire in testa a un elenco, o nessuna riga senza filtri."""
+    return ["Filtri attivi: " + ", ".join(filters_desc)] if filters_desc else []
+
+
+def result_slot_events(
+    last_context: Optional[str] = None,
+    *,
+    player_name: Optional[str] = None,
+    player1: Optional[str] = None,
+    player2: Optional[str] = None,
+    tournament: Optional[str] = None,
+    year: Optional[str] = None,
+    surface: Optional[str] = None,
+) -> List[Any]:
+    """Eventi di chiusura delle action di elenco: slot della richiesta aggiornati, poi action_listen.
+
+    `last_context` è il nome dell'action da salvare in LAST_CONTEXT_SLOT (None se non ci
+    sono risultati a cui applicare filtri); i valori vuoti diventano None.
+    """
+    return [
+        SlotSet("player_name", player_name or None),
+        SlotSet("player1", player1 or None),
+        SlotSet("player2", player2 or None),
+        SlotSet("tournament_name", tournament or None),
+        SlotSet("year", year or None),
+        SlotSet("surface", surface or None),
+        SlotSet(LAST_CONTEXT_SLOT, last_context),
+        FollowupAction("action_listen"),
+    ]
+
+
+def _open_db_connection(db_path: str) -> sqlite3.Connection:
+    """Apre una nuova connessione SQLite applicando una sola volta i PRAGMA di tuning."""
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=DB_STATEMENT_CACHE_SIZE)
+    # sqlite3.Row (in C) consente l'accesso per nome senza ricostruire un dict per riga
+    conn.row_factory = sqlite3.Row
+    for pragma in DB_CONNECTION_PRAGMAS:
+        try:
+            conn.execute(pragma)
+        except sqlite3.OperationalError:
+            # Il tuning è best-effort: un DB bloccato dal writer non deve impedire le letture.
+            pass
+    return conn
+
+
 def get_db_connection() -> sqlite3.Connection:
-    """Restituisce una connessione SQLite usando il percorso assoluto del DB."""
+    """Restituisce la connessione SQLite del thread corrente, aprendola solo al primo utilizzo.
+
+    La connessione resta aperta fra un turno e l'altro: usare `release_db_connection` al posto di `close()`.
+    """
     db_path = DB_PATH
     if not os.path.isabs(db_path):
         db_path = os.path.abspath(db_path)
-    return sqlite3.connect(db_path)
-    # Restituisce una connessione SQLite; ricordarsi di chiamare `conn.close()` dopo l'uso.
+    conn = getattr(_db_local, "conn", None)
+    if conn is not None and getattr(_db_local, "path", None) == db_path:
+        return conn
+    if conn is not None:
+        # Cambio di database: anche i nomi in cache non sono più affidabili
+        conn.close()
+        _player_name_cache.clear()
+        _tournament_names_cache.clear()
+        _distinct_names_cache.clear()
+        _tournament_ranking_cache.clear()
+        _player_lookup_cache.clear()
+        _similar_names_cache.clear()
+        _player_stats_cache.clear()
+    conn = _open_db_connection(db_path)
+    _db_local.conn = conn
+    _db_local.path = db_path
+    return conn
+
+
+def release_db_connection(conn: Optional[sqlite3.Connection]) -> None:
+    """Restituisce la connessione al pool del thread chiudendo eventuali transazioni pendenti."""
+    if conn is not None and conn.in_transaction:
+        conn.rollback()
+
+
+@contextmanager
+def pooled_cursor() -> Iterator[sqlite3.Cursor]:
+    """Cursore sulla connessione del pool, restituita con `release_db_connection` all'uscita.
+
+    Le letture del blocco avvengono in un'unica transazione (un solo snapshot WAL invece
+    di uno per statement); se la connessione è già in una transazione la si riusa.
+    """
+    conn = get_db_connection()
+    owns_transaction = not conn.in_transaction
+    if owns_transaction:
+        conn.execute("BEGIN")
+    try:
+        yield conn.cursor()
+    finally:
+        if owns_transaction:
+            release_db_connection(conn)
 
 
 def format_tournament_date(date_str: Optional[str]) -> str:
@@ -120,13 +314,91 @@ def format_tournament_date(date_str: Optional[str]) -> str:
     # Converte 'YYYYMMDD' in formato leggibile 'DD/MM/YYYY'. Se non valido, ritorna l'input.
 
 
+# Query ripetute a ogni turno: testo SQL costante, così riusano lo statement già preparato.
+PLAYER_NAME_BY_ID_SQL = "SELECT player_name FROM players WHERE id = ?"
+PLAYER_NAMES_BY_IDS_SQL = "SELECT id, player_name FROM players WHERE id IN ({placeholders})"
+TOURNAMENT_NAMES_SQL = (
+    "SELECT tourney_name FROM matches WHERE tourney_name IS NOT NULL "
+    "GROUP BY tourney_name ORDER BY MAX(tourney_date) ASC"
+)
+
+
+def _cache_store(cache: Dict[Any, Any], key: Any, value: Any) -> None:
+    """Inserisce in una cache di lookup, scartando la voce più vecchia oltre LOOKUP_CACHE_SIZE."""
+    if key not in cache and len(cache) >= LOOKUP_CACHE_SIZE:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
 def get_player_name_by_id(player_id: str, cursor: sqlite3.Cursor) -> str:
+    """Nome del giocatore con l'id indicato; se l'id non è presente nel DB restituisce l'id grezzo."""
     if not player_id:
         return "Unknown"
-    cursor.execute("SELECT player_name FROM players WHERE id = ?", (player_id,))
-    row = cursor.fetchone()
-    return row[0] if row else player_id
-    # Se l'id non è presente nel DB, ritorniamo l'id grezzo come fallback.
+    name = _player_name_cache.get(player_id)
+    if name is None:
+        cursor.execute(PLAYER_NAME_BY_ID_SQL, (player_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return player_id
+        name = row[0]
+        _cache_store(_player_name_cache, player_id, name)
+    return name
+
+
+# Limite prudente di parametri per singola query IN (SQLITE_MAX_VARIABLE_NUMBER storico: 999).
+PLAYER_NAMES_BATCH_SIZE = 500
+
+
+def get_player_names(player_ids: Iterable[str], cursor: sqlite3.Cursor) -> Dict[str, str]:
+    """Risolve in blocco gli id giocatore nei nomi, con una query IN per gli id non in cache.
+
+    Gli id assenti dal DB vengono mappati su se stessi, come in `get_player_name_by_id`.
+    """
+    names: Dict[str, str] = {}
+    missing: List[str] = []
+    for pid in {pid for pid in player_ids if pid}:
+        cached = _player_name_cache.get(pid)
+        if cached is None:
+            missing.append(pid)
+        else:
+            names[pid] = cached
+    for start in range(0, len(missing), PLAYER_NAMES_BATCH_SIZE):
+        chunk = missing[start:start + PLAYER_NAMES_BATCH_SIZE]
+        # Numero di parametri arrotondato alla potenza di 2 (ripetendo l'ultimo id): poche
+        # varianti del testo SQL, tutte riutilizzabili dalla cache degli statement.
+        size = 1 << (len(chunk) - 1).bit_length()
+        params = chunk + [chunk[-1]] * (size - len(chunk))
+        cursor.execute(PLAYER_NAMES_BY_IDS_SQL.format(placeholders=",".join("?" * size)), params)
+        found = {row[0]: row[1] for row in cursor.fetchall()}
+        for pid in chunk:
+            name = found.get(pid)
+            if name is None:
+                names[pid] = pid
+                continue
+            names[pid] = name
+            _cache_store(_player_name_cache, pid, name)
+    return names
+
+
+def get_match_player_names(match_rows: Iterable[Sequence[Any]], cursor: sqlite3.Cursor) -> Dict[str, str]:
+    """Nomi di vincitori e sconfitti di un elenco di match, risolti con un'unica query."""
+    ids: set = set()
+    for row in match_rows:
+        ids.add(row["winner_id"])
+        ids.add(row["loser_id"])
+    return get_player_names(ids, cursor)
+
+
+def joined_player_names(match_rows: Iterable[Any]) -> Dict[str, str]:
+    """Mappa id -> nome dalle colonne winner_name/loser_name già unite alla query (vedi MATCH_PLAYERS_JOIN_SQL).
+
+    Gli id senza riga in players restano mostrati come id, come in `get_player_names`.
+    """
+    names: Dict[str, str] = {}
+    for row in match_rows:
+        names[row["winner_id"]] = row["winner_name"] or row["winner_id"]
+        names[row["loser_id"]] = row["loser_name"] or row["loser_id"]
+    return names
 
 
 def normalize_year_field(value: Optional[str]) -> str:
@@ -136,83 +408,85 @@ def normalize_year_field(value: Optional[str]) -> str:
     # Restituisce anno normalizzato o stringa vuota se non estraibile.
     try:
         s = str(value).strip()
-        match = re.search(r"(19|20)\d{2}", s)
+        match = _YEAR_ANY_RE.search(s)
         if match:
             return match.group(0)
         return str(int(float(s)))
-    except Exception:
+    except (ValueError, OverflowError):
         return ""
 
 
+# Codici IOC a tre lettere -> codici ISO 3166 alpha-2 usati per le bandiere emoji.
+_IOC_TO_ISO2 = {
+    "USA": "US",
+    "GBR": "GB",
+    "ESP": "ES",
+    "ITA": "IT",
+    "FRA": "FR",
+    "GER": "DE",
+    "DEU": "DE",
+    "ARG": "AR",
+    "AUS": "AU",
+    "SRB": "RS",
+    "RUS": "RU",
+    "SUI": "CH",
+    "NED": "NL",
+    "SWE": "SE",
+    "NOR": "NO",
+    "POL": "PL",
+    "JPN": "JP",
+    "CHN": "CN",
+    "KOR": "KR",
+    "KAZ": "KZ",
+    "CZE": "CZ",
+    "SVK": "SK",
+    "CRO": "HR",
+    "BEL": "BE",
+    "POR": "PT",
+    "DEN": "DK",
+    "GRE": "GR",
+    "BUL": "BG",
+    "ROU": "RO",
+    "HUN": "HU",
+    "TUR": "TR",
+    "MEX": "MX",
+    "BRA": "BR",
+    "CAN": "CA",
+    "NZL": "NZ",
+    "IRL": "IE",
+    "ISR": "IL",
+    "IND": "IN",
+    "THA": "TH",
+    "VNM": "VN",
+    "ZAF": "ZA",
+    "ZIM": "ZW",
+    "EGY": "EG",
+    "SAU": "SA",
+    "UAE": "AE",
+    "COL": "CO",
+    "URU": "UY",
+    "CHL": "CL",
+    "PER": "PE",
+    "LTU": "LT",
+    "LUX": "LU",
+    "LVA": "LV",
+    "EST": "EE",
+    "SVN": "SI",
+}
+
+# Stringhe "IOC bandiera" precalcolate all'import per ogni codice noto.
+_IOC_TO_FLAG = {
+    code: f"{code} {''.join(chr(ord(ch) - ord('A') + 0x1F1E6) for ch in iso)}"
+    for code, iso in _IOC_TO_ISO2.items()
+}
+
+
 def ioc_to_flag(ioc_code: Optional[str]) -> str:
     """Converte un codice IOC a tre lettere aggiungendo la bandiera emoji quando possibile."""
     if not ioc_code:
         return ""
     code = str(ioc_code).strip().upper()
-    mapping = {
-        "USA": "US",
-        "GBR": "GB",
-        "ESP": "ES",
-        "ITA": "IT",
-        "FRA": "FR",
-        "GER": "DE",
-        "DEU": "DE",
-        "ARG": "AR",
-        "AUS": "AU",
-        "SRB": "RS",
-        "RUS": "RU",
-        "SUI": "CH",
-        "NED": "NL",
-        "SWE": "SE",
-        "NOR": "NO",
-        "POL": "PL",
-        "JPN": "JP",
-        "CHN": "CN",
-        "KOR": "KR",
-        "KAZ": "KZ",
-        "CZE": "CZ",
-        "SVK": "SK",
-        "CRO": "HR",
-        "BEL": "BE",
-        "POR": "PT",
-        "DEN": "DK",
-        "GRE": "GR",
-        "BUL": "BG",
-        "ROU": "RO",
-        "HUN": "HU",
-        "TUR": "TR",
-        "MEX": "MX",
-        "BRA": "BR",
-        "CAN": "CA",
-        "NZL": "NZ",
-        "IRL": "IE",
-        "ISR": "IL",
-        "IND": "IN",
-        "THA": "TH",
-        "VNM": "VN",
-        "ZAF": "ZA",
-        "ZIM": "ZW",
-        "EGY": "EG",
-        "SAU": "SA",
-        "UAE": "AE",
-        "COL": "CO",
-        "URU": "UY",
-        "CHL": "CL",
-        "PER": "PE",
-        "LTU": "LT",
-        "LUX": "LU",
-        "LVA": "LV",
-        "EST": "EE",
-        "SVN": "SI",
-    }
-    alpha2 = mapping.get(code)
-    if not alpha2:
-        return code
-    try:
-        flag = "".join(chr(ord(ch) - ord("A") + 0x1F1E6) for ch in alpha2.upper())
-        return f"{code} {flag}"
-    except Exception:
-        return code
+    return _IOC_TO_FLAG.get(code, code)
     # Ritorna codice IOC e emoji bandiera quando possibile.
 
 
@@ -220,7 +494,7 @@ def extract_year_from_text(text: str) -> Optional[str]:
     """Restituisce il primo anno YYYY trovato nel testo."""
     if not text:
         return None
-    match = re.search(r"\b(?:19|20)\d{2}\b", text)
+    match = _YEAR_RE.search(text)
     return match.group(0) if match else None
 
 
@@ -229,12 +503,12 @@ def extract_name_from_text(text: str) -> str:
     if not text:
         return ""
     s = str(text).strip()
-    m = re.match(r"(?i)^\s*chi\s*(?:\u00E8|e'|e)\s+(.+)$", s)
+    m = _CHI_E_RE.match(s)
     if not m:
-        m = re.match(r"(?i)^\s*who\s+is\s+(.+)$", s)
+        m = _WHO_IS_RE.match(s)
     if m:
         name = m.group(1).strip()
-        return re.sub(r"[\?\!\.,]+$", "", name).strip()
+        return _TRAIL_PUNCT_RE.sub("", name).strip()
     return ""
 
 
@@ -248,11 +522,8 @@ def extract_surface_from_text(text: str) -> Optional[str]:
     """Normalizza eventuali riferimenti alla superficie nel valore salvato a DB."""
     if not text:
         return None
-    s = str(text).lower()
-    for key, value in SURFACE_KEYWORDS.items():
-        if key in s:
-            return value
-    return None
+    match = _SURFACE_RE.search(str(text).lower())
+    return SURFACE_KEYWORDS[match.group(0)] if match else None
 
 
 def normalize_surface_value(value: Optional[str]) -> Optional[str]:
@@ -267,7 +538,7 @@ def normalize_year_value(value: Optional[str]) -> Optional[str]:
     if not value:
         return None
     s = str(value)
-    match = re.search(r"(19|20)\d{2}", s)
+    match = _YEAR_ANY_RE.search(s)
     return match.group(0) if match else None
 
 
@@ -277,6 +548,7 @@ class FilterContext:
     intent_name: Text
     text: Text
     entities: List[Dict[Text, Any]]
+    players: List[Any]
     year: Optional[str]
     surface: Optional[str]
     tournament: Optional[str]
@@ -338,21 +610,36 @@ class FilterContext:
 
 def build_filter_context(tracker: Tracker) -> FilterContext:
     """Aggrega le informazioni dell'ultimo messaggio e degli slot in un unico contesto filtro."""
+    # Il tracker è immutabile durante l'esecuzione dell'action: il contesto si calcola una volta sola.
+    cached = getattr(tracker, FILTER_CONTEXT_CACHE_ATTR, None)
+    if cached is not None:
+        return cached
+
     latest = tracker.latest_message or {}
     intent_name = (latest.get("intent") or {}).get("name") or ""
     text = latest.get("text", "") or ""
     entities = (latest.get("entities") or [])[:]
 
-    year_entities = [e.get("value") for e in entities if e.get("entity") == "year"]
-    surface_entities = [e.get("value") for e in entities if e.get("entity") == "surface"]
-    tournament_entities = [e.get("value") for e in entities if e.get("entity") == "tournament"]
+    # Una sola passata sulle entità: per ogni tipo conta solo il primo valore estratto,
+    # tranne i giocatori che vengono raccolti tutti (head-to-head, risultati fra due giocatori)
+    first_entity: Dict[Text, Any] = {}
+    players: List[Any] = []
+    for e in entities:
+        entity_type = e.get("entity")
+        if entity_type == "player":
+            players.append(e.get("value"))
+        first_entity.setdefault(entity_type, e.get("value"))
 
     # Analizza il testo e le entità per capire se l'utente ha specificato anno/superficie/torneo
-    message_year = normalize_year_value(year_entities[0]) if year_entities else extract_year_from_text(text)
+    message_year = (
+        normalize_year_value(first_entity["year"]) if "year" in first_entity else extract_year_from_text(text)
+    )
     message_surface = (
-        normalize_surface_value(surface_entities[0]) if surface_entities else extract_surface_from_text(text)
+        normalize_surface_value(first_entity["surface"])
+        if "surface" in first_entity
+        else extract_surface_from_text(text)
     )
-    message_tournament = tournament_entities[0] if tournament_entities else None
+    message_tournament = first_entity.get("tournament")
 
     slot_year = tracker.get_slot("year")
     slot_surface = tracker.get_slot("surface")
@@ -374,10 +661,11 @@ def build_filter_context(tracker: Tracker) -> FilterContext:
         explicit_tournament = tournament is not None
 
     # Raccoglie i dati normalizzati in un'unica struttura comoda da passare alle azioni
-    return FilterContext(
+    ctx = FilterContext(
         intent_name=intent_name,
         text=text,
         entities=entities,
+        players=players,
         year=year,
         surface=surface,
         tournament=tournament,
@@ -391,85 +679,244 @@ def build_filter_context(tracker: Tracker) -> FilterContext:
         explicit_surface=explicit_surface,
         explicit_tournament=explicit_tournament,
     )
+    try:
+        setattr(tracker, FILTER_CONTEXT_CACHE_ATTR, ctx)
+    except AttributeError:
+        pass
+    return ctx
+
+
+# Colonne della tabella matches, nell'ordine dello schema creato da db_create.py.
+MATCH_COLUMNS = (
+    "match_id", "tourney_name", "surface", "draw_size", "tourney_level", "tourney_date",
+    "match_num", "winner_id", "loser_id", "winner_seed", "loser_seed", "score", "best_of",
+    "round", "minutes", "w_ace", "w_df", "w_svpt", "w_1stIn", "w_1stWon", "w_2ndWon",
+    "w_SvGms", "w_bpSaved", "w_bpFaced", "l_ace", "l_df", "l_svpt", "l_1stIn", "l_1stWon",
+    "l_2ndWon", "l_SvGms", "l_bpSaved", "l_bpFaced", "ongoing",
+)
+MATCH_COLUMNS_SQL = ", ".join(MATCH_COLUMNS)
+# Colonne lette da `get_match_display_info`, per le query che non mostrano il dettaglio completo.
+MATCH_DISPLAY_COLUMNS = (
+    "match_id", "tourney_name", "surface", "tourney_level", "tourney_date", "winner_id",
+    "loser_id", "score", "round", "minutes", "ongoing",
+)
+MATCH_DISPLAY_COLUMNS_SQL = ", ".join(MATCH_DISPLAY_COLUMNS)
+# Stesse colonne con i nomi dei due giocatori, letti con una JOIN invece che con una query a parte.
+MATCH_PLAYERS_JOIN_SQL = (
+    "matches m LEFT JOIN players pw ON pw.id = m.winner_id LEFT JOIN players pl ON pl.id = m.loser_id"
+)
+MATCH_DISPLAY_NAMED_COLUMNS_SQL = (
+    ", ".join(f"m.{column}" for column in MATCH_DISPLAY_COLUMNS)
+    + ", pw.player_name AS winner_name, pl.player_name AS loser_name"
+)
+# Colonne INTEGER mostrate nel dettaglio del match (durata, flag e statistiche di servizio).
+MATCH_NUMERIC_COLUMNS = ("minutes",) + MATCH_COLUMNS[MATCH_COLUMNS.index("w_ace") :]
+
+# Statistiche al servizio sommate da ActionPlayerStats, nell'ordine delle colonne w_*/l_*.
+SERVE_STAT_FIELDS = ("ace", "df", "svpt", "1stIn", "1stWon", "2ndWon", "SvGms", "bpSaved", "bpFaced")
+# Flag calcolati da SQLite per ogni match: vittoria del giocatore (unico parametro, l'id),
+# ritiro/walkover, tie-break, finale. LIKE confronta gia' senza distinzione di maiuscole
+# (ASCII, come UPPER), quindi lo score non viene ricopiato in maiuscolo per ogni test.
+PLAYER_STATS_FLAGS_SQL = (
+    "winner_id = ?",
+    "(IFNULL(score, '') LIKE '%RET%' OR IFNULL(score, '') LIKE '%W/O%')",
+    "(IFNULL(score, '') LIKE '%TB%' OR IFNULL(score, '') LIKE '%7-%')",
+    "UPPER(IFNULL(round, '')) IN ('F', 'FIN', 'FINAL')",
+)
+# Colonne lette da ActionPlayerStats: dopo quelle descrittive, a partire da
+# PLAYER_STATS_NUMERIC_OFFSET, solo interi (i flag, poi le statistiche w_*/l_* con NULL e testo a 0).
+PLAYER_STATS_COLUMNS_SQL = (
+    "tourney_name, surface, tourney_date, "
+    + ", ".join(PLAYER_STATS_FLAGS_SQL)
+    + ", "
+    + ", ".join(
+        f"IFNULL(CAST({side}{field} AS INTEGER), 0)" for side in ("w_", "l_") for field in SERVE_STAT_FIELDS
+    )
+)
+PLAYER_STATS_NUMERIC_OFFSET = 3
 
+# Chiave naturale di un match: stessa data, torneo, turno, coppia di giocatori (in qualunque
+# ruolo), numero di match e punteggio, con nomi e turni confrontati senza maiuscole né spazi.
+MATCH_SIGNATURE_SQL = (
+    "COALESCE(tourney_date, ''), LOWER(TRIM(COALESCE(tourney_name, ''))), "
+    "LOWER(TRIM(COALESCE(round, ''))), MIN(winner_id, loser_id), MAX(winner_id, loser_id), "
+    "COALESCE(match_num, ''), TRIM(COALESCE(score, ''))"
+)
 
-def fetch_rows_as_dicts(
-    cursor: sqlite3.Cursor,
-    query: str,
-    params: List[Any],
-    include_raw: bool = False,
-) -> List[Dict[str, Any]]:
-    cursor.execute(query, params)
-    columns = [desc[0] for desc in cursor.description]
-    rows = []
-    for raw in cursor.fetchall():
-        data = dict(zip(columns, raw))
-        if include_raw:
-            data["__raw__"] = raw
-        rows.append(data)
-    return rows
-
-
-def make_match_signature(row: Union[Dict[str, Any], Tuple[Any, ...]]) -> Tuple[Any, ...]:
-    """Costruisce una firma hashabile per riconoscere i match unici."""
-    if isinstance(row, dict):
-        tourney_date = row.get("tourney_date")
-        tourney_name = (row.get("tourney_name") or "").strip().lower()
-        round_name = (row.get("round") or "").strip().lower()
-        match_num = row.get("match_num")
-        winner_id = str(row.get("winner_id") or "")
-        loser_id = str(row.get("loser_id") or "")
-        score = (row.get("score") or "").strip()
-    else:
-        tourney_date = row[5] if len(row) > 5 else None
-        tourney_name = (row[1] or "").strip().lower() if len(row) > 1 else ""
-        round_name = (row[13] or "").strip().lower() if len(row) > 13 else ""
-        match_num = row[6] if len(row) > 6 else None
-        winner_id = str(row[7] or "") if len(row) > 7 else ""
-        loser_id = str(row[8] or "") if len(row) > 8 else ""
-        score = (row[11] or "").strip() if len(row) > 11 else ""
-
-    participants = tuple(sorted((winner_id, loser_id)))
-    return (
-        str(tourney_date or ""),
-        tourney_name,
-        round_name,
-        participants,
-        str(match_num or ""),
-        score,
+
+def unique_matches_query(columns: str, where: str, limit: Optional[int] = None) -> str:
+    """Costruisce la SELECT dei match filtrati scartando i duplicati direttamente in SQL.
+
+    A parità di firma (`MATCH_SIGNATURE_SQL`) resta la riga più recente,
+    e il risultato è ordinato per data e match_id decrescenti.
+    """
+    query = (
+        f"SELECT {columns} FROM ("
+        f"SELECT *, ROW_NUMBER() OVER (PARTITION BY {MATCH_SIGNATURE_SQL} "
+        "ORDER BY tourney_date DESC, match_id DESC) AS dup_rank "
+        f"FROM matches WHERE {where}"
+        ") WHERE dup_rank = 1 ORDER BY tourney_date DESC, match_id DESC"
     )
+    if limit:
+        query += f" LIMIT {int(limit)}"
+    return query
 
 
-def deduplicate_matches(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Rimuove i duplicati (stesso evento/data/vincitore/perdente/punteggio)."""
-    seen: set = set()
-    unique_rows: List[Dict[str, Any]] = []
-    for row in rows:
-        key = make_match_signature(row)
-        if key not in seen:
-            seen.add(key)
-            unique_rows.append(row)
-    return unique_rows
+# Filtri opzionali delle query sui match, nell'ordine (anno, superficie, torneo).
+MATCH_FILTER_CLAUSES = (" AND tourney_date LIKE ?", " AND surface = ?", " AND tourney_name LIKE ?")
+PLAYER_MATCHES_WHERE = "(winner_id = ? OR loser_id = ?)"
+H2H_MATCHES_WHERE = "((winner_id = ? AND loser_id = ?) OR (winner_id = ? AND loser_id = ?))"
 
 
-def fetch_unique_match_dicts(
-    cursor: sqlite3.Cursor,
-    query: str,
-    params: List[Any],
-) -> List[Dict[str, Any]]:
-    """Esegue la query restituendo dizionari di match (con la tupla raw) senza duplicati."""
-    # Uso il raw tuple per avere tutte le colonne disponibili nelle stampe dettagliate
-    rows = fetch_rows_as_dicts(cursor, query, params, include_raw=True)
-    unique_rows: List[Dict[str, Any]] = []
-    seen: set = set()
-    for row in rows:
-        raw = row.get("__raw__")
-        key = make_match_signature(raw if raw is not None else row)
-        if key in seen:
-            continue
-        seen.add(key)
-        unique_rows.append(row)
-    return unique_rows
+def _build_filtered_queries(
+    columns: str, base_where: str, limit: Optional[int] = None
+) -> Dict[Tuple[bool, bool, bool], str]:
+    """Precompone le 8 varianti della query (una per combinazione di filtri attivi)."""
+    return {
+        mask: unique_matches_query(
+            columns,
+            base_where + "".join(clause for clause, active in zip(MATCH_FILTER_CLAUSES, mask) if active),
+            limit,
+        )
+        for mask in itertools.product((False, True), repeat=3)
+    }
+
+
+# Testi SQL costanti: ogni combinazione di filtri riusa lo statement già preparato.
+PLAYER_STATS_QUERIES = _build_filtered_queries(PLAYER_STATS_COLUMNS_SQL, PLAYER_MATCHES_WHERE)
+H2H_RECENT_QUERIES = _build_filtered_queries(MATCH_DISPLAY_COLUMNS_SQL, H2H_MATCHES_WHERE, limit=5)
+# Dettaglio del match più recente più altri 3; `match_total` conta tutti i match (senza duplicati)
+# che rispettano i filtri, così basta leggere le sole righe mostrate.
+H2H_DETAIL_QUERIES = _build_filtered_queries(
+    MATCH_COLUMNS_SQL + ", COUNT(*) OVER () AS match_total", H2H_MATCHES_WHERE, limit=4
+)
+
+
+def _build_listing_queries(base_where: str, limit: int) -> Dict[Tuple[bool, bool, bool], str]:
+    """Come `_build_filtered_queries`, per gli elenchi di ActionMatchResult (senza deduplica).
+
+    Le righe includono winner_name/loser_name: i nomi si ricavano con `joined_player_names`.
+    """
+    return {
+        mask: (
+            f"SELECT {MATCH_DISPLAY_NAMED_COLUMNS_SQL} FROM {MATCH_PLAYERS_JOIN_SQL} WHERE {base_where}"
+            + "".join(clause for clause, active in zip(MATCH_FILTER_CLAUSES, mask) if active)
+            + f" ORDER BY m.tourney_date DESC, m.match_id DESC LIMIT {int(limit)}"
+        )
+        for mask in itertools.product((False, True), repeat=3)
+    }
+
+
+# Ultimi match di un giocatore, di un torneo (nome canonico) e di tutto il circuito:
+# la condizione costante "1" permette di accodare i filtri anche senza condizione di base.
+PLAYER_LATEST_QUERIES = _build_listing_queries(PLAYER_MATCHES_WHERE, limit=5)
+TOURNAMENT_LATEST_QUERIES = _build_listing_queries("tourney_name = ?", limit=5)
+LATEST_MATCHES_QUERIES = _build_listing_queries("1", limit=5)
+
+# Riepilogo head-to-head aggregato da SQLite per (superficie, anno) sui match senza duplicati.
+# `first_pos` è la posizione del match più recente del gruppo, per conservare l'ordine di comparsa.
+# Parametri: id del primo giocatore, poi quelli della query dei match.
+H2H_SUMMARY_SQL = (
+    "SELECT surface, SUBSTR(tourney_date, 1, 4) AS year, COUNT(*) AS matches, "
+    "SUM(winner_id = ?) AS p1_wins, MIN(pos) AS first_pos "
+    "FROM (SELECT surface, tourney_date, winner_id, "
+    "ROW_NUMBER() OVER (ORDER BY tourney_date DESC, match_id DESC) AS pos FROM ({matches})) "
+    "GROUP BY surface, year ORDER BY first_pos"
+)
+H2H_SUMMARY_QUERIES = {
+    mask: H2H_SUMMARY_SQL.format(matches=query)
+    for mask, query in _build_filtered_queries(
+        "surface, tourney_date, winner_id, match_id", H2H_MATCHES_WHERE
+    ).items()
+}
+
+
+def match_filter_params(
+    year_filter: Optional[str],
+    surface_filter: Optional[str],
+    tournament_filter: Optional[str],
+) -> Tuple[Tuple[bool, bool, bool], List[Any]]:
+    """Restituisce la chiave delle query precomposte e i parametri dei filtri attivi."""
+    mask = (bool(year_filter), bool(surface_filter), bool(tournament_filter))
+    params: List[Any] = []
+    if year_filter:
+        params.append(f"{year_filter}%")
+    if surface_filter:
+        params.append(surface_filter)
+    if tournament_filter:
+        params.append(f"%{tournament_filter}%")
+    return mask, params
+
+
+# Ultimo match del giocatore: la LIMIT 1 su ciascun lato usa gli indici winner/loser, poi
+# si tiene il più recente dei due (stesso ordinamento di SQLite: le date NULL vengono per ultime).
+LAST_MATCH_SQL = (
+    f"SELECT * FROM (SELECT {MATCH_DISPLAY_COLUMNS_SQL} FROM matches WHERE winner_id = ? "
+    "ORDER BY tourney_date DESC, match_id DESC LIMIT 1) "
+    f"UNION ALL SELECT * FROM (SELECT {MATCH_DISPLAY_COLUMNS_SQL} FROM matches WHERE loser_id = ? "
+    "ORDER BY tourney_date DESC, match_id DESC LIMIT 1) "
+    "ORDER BY tourney_date DESC, match_id DESC LIMIT 1"
+)
+# Scheda del giocatore e ultimo match in un solo round-trip (parametri: id, id, id).
+# Le prime colonne sono PLAYER_INFO_COLUMNS; se il giocatore non ha match quelle del match sono NULL.
+PLAYER_INFO_COLUMNS = (
+    "id", "player_name", "atpname", "birthdate", "weight", "height", "turned_pro",
+    "birthplace", "coaches", "hand", "backhand", "ioc", "active",
+)
+PLAYER_INFO_SQL = (
+    "SELECT " + ", ".join(f"p.{col}" for col in PLAYER_INFO_COLUMNS) + ", lm.* "
+    f"FROM players AS p LEFT JOIN ({LAST_MATCH_SQL}) AS lm "
+    "WHERE p.id = ?"
+)
+
+
+# Query di ActionTournamentInfo e ActionMatchResult._handle_tournament, definite una volta
+# sola: lo stesso testo SQL riusa lo statement già preparato nella cache della connessione.
+# Riepilogo del torneo più giocato che corrisponde al pattern LIKE.
+TOURNAMENT_SUMMARY_SQL = (
+    "SELECT tourney_name, surface, COUNT(*) AS match_count, "
+    "MIN(tourney_date) AS first_date, MAX(tourney_date) AS last_date "
+    "FROM matches WHERE tourney_name LIKE ? "
+    "GROUP BY tourney_name, surface "
+    "ORDER BY match_count DESC "
+    "LIMIT 1"
+)
+# Nomi dei tornei dal più giocato al meno giocato, per `find_canonical_tournament`.
+TOURNAMENT_RANKING_SQL = (
+    "SELECT tourney_name FROM matches WHERE tourney_name IS NOT NULL "
+    "GROUP BY tourney_name ORDER BY COUNT(*) DESC, tourney_name"
+)
+# Finale dell'ultima edizione (parametri: nome, data ultima edizione) se presente,
+# altrimenti la finale più recente.
+TOURNAMENT_CHAMPION_SQL = (
+    f"SELECT {MATCH_DISPLAY_COLUMNS_SQL} FROM matches "
+    "WHERE tourney_name = ? COLLATE NOCASE AND UPPER(round) IN ('F', 'FIN', 'FINAL') "
+    "ORDER BY (tourney_date = ?) DESC, tourney_date DESC, match_id DESC LIMIT 1"
+)
+# Ultime partite di un torneo.
+TOURNAMENT_RECENT_SQL = (
+    f"SELECT {MATCH_DISPLAY_COLUMNS_SQL} FROM matches WHERE tourney_name LIKE ? "
+    "ORDER BY tourney_date DESC, match_id DESC LIMIT 5"
+)
+# Le 2 partite più recenti di ogni torneo in corso (ActionOngoingTournaments): la finestra
+# scarta in SQL le altre righe, e i nomi dei giocatori si uniscono solo a quelle restanti.
+ONGOING_MATCHES_SQL = (
+    f"WITH ranked AS (SELECT {MATCH_DISPLAY_COLUMNS_SQL}, ROW_NUMBER() OVER ("
+    "PARTITION BY tourney_name ORDER BY tourney_date DESC, match_id DESC) AS tourney_rank "
+    "FROM matches WHERE ongoing = 1) "
+    f"SELECT {MATCH_DISPLAY_NAMED_COLUMNS_SQL} FROM ranked m "
+    "LEFT JOIN players pw ON pw.id = m.winner_id LEFT JOIN players pl ON pl.id = m.loser_id "
+    "WHERE m.tourney_rank <= 2 ORDER BY m.tourney_date DESC, m.match_id DESC"
+)
+
+
+def tournament_like_patterns(name: str) -> Tuple[str, str]:
+    """Pattern LIKE per cercare un torneo: prima il prefisso, poi la sottostringa.
+
+    `nome%` sfrutta l'indice `tourney_name COLLATE NOCASE`, mentre `%nome%` richiede
+    una scansione: si usa il secondo solo se il primo non trova nulla.
+    """
+    return f"{name}%", f"%{name}%"
 
 
 def find_best_tournament(
@@ -483,49 +930,62 @@ def find_best_tournament(
     if len(clean) < 3:
         return None
 
+    # Un'unica scansione: il match esatto vince, poi la sottostringa intera, poi i token
+    # separati (ogni pattern è un sottoinsieme del successivo, quindi basta filtrare sul più largo).
+    # LIKE e COLLATE NOCASE ignorano già le maiuscole ASCII: niente LOWER() per riga.
     cursor.execute(
         """
-        SELECT tourney_name
-        FROM matches
-        WHERE LOWER(tourney_name) = LOWER(?)
-        ORDER BY tourney_date DESC
-        LIMIT 1
-        """,
-        (clean,),
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
-
-    cursor.execute(
-        """
-        SELECT tourney_name, COUNT(*) AS cnt
+        SELECT tourney_name,
+               CASE
+                   WHEN tourney_name = ? COLLATE NOCASE THEN 0
+                   WHEN tourney_name LIKE ? THEN 1
+                   ELSE 2
+               END AS prio,
+               COUNT(*) AS cnt,
+               MAX(tourney_date) AS last_date
         FROM matches
-        WHERE LOWER(tourney_name) LIKE LOWER(?)
+        WHERE tourney_name LIKE ?
         GROUP BY tourney_name
-        ORDER BY cnt DESC
+        ORDER BY prio ASC, CASE WHEN prio = 0 THEN last_date END DESC, cnt DESC
         LIMIT 1
         """,
-        (f"%{clean}%",),
+        (clean, f"%{clean}%", f"%{'%'.join(clean.split())}%"),
     )
     row = cursor.fetchone()
-    if row:
-        return row[0]
+    return row[0] if row else None
 
-    cursor.execute(
-        """
-        SELECT tourney_name, COUNT(*) AS cnt
-        FROM matches
-        WHERE LOWER(tourney_name) LIKE LOWER(?)
-        GROUP BY tourney_name
-        ORDER BY cnt DESC
-        LIMIT 1
-        """,
-        (f"%{'%'.join(clean.split())}%",),
-    )
-    row = cursor.fetchone()
-    if row:
-        return row[0]
+
+def get_tournament_names(cursor: sqlite3.Cursor) -> Dict[str, str]:
+    """Restituisce (e memorizza) la mappa nome torneo minuscolo -> nome canonico."""
+    if not _tournament_names_cache:
+        # A parità di nome minuscolo prevale la grafia più recente, come in find_best_tournament
+        cursor.execute(TOURNAMENT_NAMES_SQL)
+        for (name,) in cursor.fetchall():
+            _tournament_names_cache[name.lower()] = name
+    return _tournament_names_cache
+
+
+def find_canonical_tournament(cursor: sqlite3.Cursor, name: str) -> Optional[str]:
+    """Nome canonico del torneo più giocato che inizia con `name` o, in mancanza, lo contiene.
+
+    Equivale a provare i pattern di `tournament_like_patterns` (LIKE ignora le maiuscole ASCII),
+    ma la classifica dei tornei viene tenuta in memoria per PLAYER_STATS_CACHE_TTL secondi.
+    """
+    global _tournament_ranking_loaded_at
+    now = time.monotonic()
+    if not _tournament_ranking_cache or now - _tournament_ranking_loaded_at >= PLAYER_STATS_CACHE_TTL:
+        cursor.execute(TOURNAMENT_RANKING_SQL)
+        _tournament_ranking_cache[:] = [
+            (tourney.translate(_ASCII_LOWER_TABLE), tourney) for (tourney,) in cursor.fetchall()
+        ]
+        _tournament_ranking_loaded_at = now
+    key = name.translate(_ASCII_LOWER_TABLE)
+    for lowered, canonical in _tournament_ranking_cache:
+        if lowered.startswith(key):
+            return canonical
+    for lowered, canonical in _tournament_ranking_cache:
+        if key in lowered:
+            return canonical
     return None
 
 
@@ -538,7 +998,7 @@ def guess_tournament_from_text(
     if not text:
         return None
     exclude_set = {s.strip().lower() for s in (exclude or []) if s}
-    tokens = re.findall(r"[A-Za-zÀ-ÖØ-öø-ÿ']+", text)
+    tokens = _TOKEN_RE.findall(text)
     tokens = [t for t in tokens if len(t) >= 3]
     if not tokens:
         return None
@@ -552,6 +1012,13 @@ def guess_tournament_from_text(
                 continue
             candidates.append(phrase)
 
+    # Prima un confronto esatto in memoria (dal n-gramma più lungo), senza interrogare il DB
+    known = get_tournament_names(cursor)
+    for phrase in candidates:
+        tournament = known.get(phrase.lower())
+        if tournament:
+            return tournament
+
     tried: set = set()
     for phrase in candidates:
         key = phrase.lower()
@@ -564,124 +1031,126 @@ def guess_tournament_from_text(
     return None
 
 
-def format_match_details(match_row: Dict[str, Any], cursor: sqlite3.Cursor) -> List[str]:
+# Intestazione del dettaglio match; le righe opzionali arrivano già complete di "\n" (o vuote).
+MATCH_HEADER_TEMPLATE = (
+    "{header}\n"
+    "{winner} bt {loser} {score}\n"
+    "Superficie: {surface}\n"
+    "Livello: {level}\n"
+    "{date_line}"
+    "Draw: {draw_size} | Match #: {match_num} | Best of: {best_of}\n"
+    "{minutes_line}"
+    "{seed_line}"
+    "Match ID interno: {match_id}"
+    "{ongoing_line}"
+)
+
+# Blocco delle statistiche al servizio di un giocatore (preceduto da una riga vuota).
+SERVE_STATS_TEMPLATE = (
+    "\n"
+    "{title}\n"
+    "Ace: {ace} | Doppi falli: {df}\n"
+    "Prime in: {first_in}\n"
+    "Punti vinti con la 1a: {first_won}\n"
+    "Punti vinti con la 2a: {second_won}\n"
+    "Game al servizio: {svgms}\n"
+    "Break point salvati: {bp_saved}"
+)
+
+
+def _format_serve_stats(player_name: str, prefix: str, nums: Dict[str, int]) -> str:
+    """Compila SERVE_STATS_TEMPLATE per il vincitore (`w_`) o lo sconfitto (`l_`)."""
+    svpt = nums[prefix + "svpt"]
+    first_in = nums[prefix + "1stIn"]
+    first_won = nums[prefix + "1stWon"]
+    second_won = nums[prefix + "2ndWon"]
+    bp_saved = nums[prefix + "bpSaved"]
+    bp_faced = nums[prefix + "bpFaced"]
+    second_total = max(svpt - first_in, 0)
+
+    if bp_faced:
+        bp_text = f"{bp_saved}/{bp_faced} ({bp_saved / bp_faced * 100.0:.1f}%)"
+    elif bp_saved:
+        bp_text = f"{bp_saved}/0 (-)"
+    else:
+        bp_text = "n/d (nessuno affrontato)"
+
+    return SERVE_STATS_TEMPLATE.format(
+        title=to_unicode_bold(f"Statistiche {player_name}"),
+        ace=nums[prefix + "ace"],
+        df=nums[prefix + "df"],
+        first_in=f"{first_in}/{svpt} ({first_in / svpt * 100.0:.1f}%)" if svpt else "0/0 (-)",
+        first_won=f"{first_won}/{first_in} ({first_won / first_in * 100.0:.1f}%)" if first_in else "0/0 (-)",
+        second_won=(
+            f"{second_won}/{second_total} ({second_won / second_total * 100.0:.1f}%)"
+            if second_total
+            else "0/0 (-)"
+        ),
+        svgms=nums[prefix + "SvGms"],
+        bp_saved=bp_text,
+    )
+
+
+def format_match_details(match_row: sqlite3.Row, names: Dict[str, str]) -> List[str]:
     """Restituisce una descrizione testuale dettagliata di un singolo match."""
-    raw = match_row.get("__raw__")
-    info = get_match_display_info(raw, cursor) if raw else {}
+    info = get_match_display_info(match_row, names)
+
+    # Colonne numeriche lette una volta sola: NULL o valori non numerici valgono 0
+    nums: Dict[str, int] = {}
+    for col in MATCH_NUMERIC_COLUMNS:
+        value = match_row[col]
+        nums[col] = int(value) if isinstance(value, (int, float)) else 0
 
     # Se il DB ha ID ma non i nomi, recupero i nomi leggibili tramite get_match_display_info
-    tournament = info.get("tournament") or display_value(match_row.get("tourney_name"))
-    round_name = info.get("round") or display_value(match_row.get("round"))
-    year = info.get("year") or (str(match_row.get("tourney_date") or "")[:4] or "N/A")
+    tournament = info.get("tournament") or display_value(match_row["tourney_name"])
+    round_name = info.get("round") or display_value(match_row["round"])
+    year = info.get("year") or (str(match_row["tourney_date"] or "")[:4] or "N/A")
     header = to_unicode_bold(f"{tournament} {year}") + f" - {round_name}"
 
-    winner_name = info.get("winner") or display_value(match_row.get("winner_id"))
-    loser_name = info.get("loser") or display_value(match_row.get("loser_id"))
-    score = info.get("score") or display_value(match_row.get("score"))
+    winner_name = info.get("winner") or display_value(match_row["winner_id"])
+    loser_name = info.get("loser") or display_value(match_row["loser_id"])
+    score = info.get("score") or display_value(match_row["score"])
 
-    surface_code = match_row.get("surface")
+    surface_code = match_row["surface"]
     surface_label = SURFACE_LABELS.get(surface_code, display_value(surface_code))
-    level = display_value(match_row.get("tourney_level"))
-    match_date = format_tournament_date(match_row.get("tourney_date"))
-    draw_size = display_value(match_row.get("draw_size"))
-    match_num = display_value(match_row.get("match_num"))
-    best_of = display_value(match_row.get("best_of"))
-    minutes = safe_int(match_row.get("minutes"))
-    winner_seed = display_value(match_row.get("winner_seed"), "-")
-    loser_seed = display_value(match_row.get("loser_seed"), "-")
-    ongoing_flag = safe_int(match_row.get("ongoing"))
-
-    def pct(numer: int, denom: int) -> float:
-        return (numer / denom * 100.0) if denom > 0 else 0.0
-
-    lines: List[str] = [
-        header,
-        f"{winner_name} bt {loser_name} {score}",
-        f"Superficie: {surface_label}",
-        f"Livello: {level}",
-    ]
-    if match_date != "N/A":
-        lines.append(f"Data: {match_date}")
-    lines.append(f"Draw: {draw_size} | Match #: {match_num} | Best of: {best_of}")
-    if minutes:
-        lines.append(f"Durata: {minutes} minuti")
-    if winner_seed != "-" or loser_seed != "-":
-        lines.append(f"Seed: {winner_name} {winner_seed} / {loser_name} {loser_seed}")
-    lines.append(f"Match ID interno: {display_value(match_row.get('match_id'))}")
-    if ongoing_flag:
-        lines.append("Stato: incontro in corso (dati parziali)")
-
-    # Winner stats
-    w_ace = safe_int(match_row.get("w_ace"))
-    w_df = safe_int(match_row.get("w_df"))
-    w_svpt = safe_int(match_row.get("w_svpt"))
-    w_1stIn = safe_int(match_row.get("w_1stIn"))
-    w_1stWon = safe_int(match_row.get("w_1stWon"))
-    w_2ndWon = safe_int(match_row.get("w_2ndWon"))
-    w_SvGms = safe_int(match_row.get("w_SvGms"))
-    w_bpSaved = safe_int(match_row.get("w_bpSaved"))
-    w_bpFaced = safe_int(match_row.get("w_bpFaced"))
-    w_second_total = max(w_svpt - w_1stIn, 0)
-
-    lines.append("")
-    lines.append(to_unicode_bold(f"Statistiche {winner_name}"))
-    lines.append(f"Ace: {w_ace} | Doppi falli: {w_df}")
-    if w_svpt:
-        lines.append(f"Prime in: {w_1stIn}/{w_svpt} ({pct(w_1stIn, w_svpt):.1f}%)")
-    else:
-        lines.append("Prime in: 0/0 (-)")
-    if w_1stIn:
-        lines.append(f"Punti vinti con la 1a: {w_1stWon}/{w_1stIn} ({pct(w_1stWon, w_1stIn):.1f}%)")
-    else:
-        lines.append("Punti vinti con la 1a: 0/0 (-)")
-    if w_second_total:
-        lines.append(f"Punti vinti con la 2a: {w_2ndWon}/{w_second_total} ({pct(w_2ndWon, w_second_total):.1f}%)")
-    else:
-        lines.append("Punti vinti con la 2a: 0/0 (-)")
-    lines.append(f"Game al servizio: {w_SvGms}")
-    if w_bpFaced:
-        lines.append(f"Break point salvati: {w_bpSaved}/{w_bpFaced} ({pct(w_bpSaved, w_bpFaced):.1f}%)")
-    elif w_bpSaved:
-        lines.append(f"Break point salvati: {w_bpSaved}/0 (-)")
-    else:
-        lines.append("Break point salvati: n/d (nessuno affrontato)")
-
-    # Loser stats
-    l_ace = safe_int(match_row.get("l_ace"))
-    l_df = safe_int(match_row.get("l_df"))
-    l_svpt = safe_int(match_row.get("l_svpt"))
-    l_1stIn = safe_int(match_row.get("l_1stIn"))
-    l_1stWon = safe_int(match_row.get("l_1stWon"))
-    l_2ndWon = safe_int(match_row.get("l_2ndWon"))
-    l_SvGms = safe_int(match_row.get("l_SvGms"))
-    l_bpSaved = safe_int(match_row.get("l_bpSaved"))
-    l_bpFaced = safe_int(match_row.get("l_bpFaced"))
-    l_second_total = max(l_svpt - l_1stIn, 0)
-
-    lines.append("")
-    lines.append(to_unicode_bold(f"Statistiche {loser_name}"))
-    lines.append(f"Ace: {l_ace} | Doppi falli: {l_df}")
-    if l_svpt:
-        lines.append(f"Prime in: {l_1stIn}/{l_svpt} ({pct(l_1stIn, l_svpt):.1f}%)")
-    else:
-        lines.append("Prime in: 0/0 (-)")
-    if l_1stIn:
-        lines.append(f"Punti vinti con la 1a: {l_1stWon}/{l_1stIn} ({pct(l_1stWon, l_1stIn):.1f}%)")
-    else:
-        lines.append("Punti vinti con la 1a: 0/0 (-)")
-    if l_second_total:
-        lines.append(f"Punti vinti con la 2a: {l_2ndWon}/{l_second_total} ({pct(l_2ndWon, l_second_total):.1f}%)")
-    else:
-        lines.append("Punti vinti con la 2a: 0/0 (-)")
-    lines.append(f"Game al servizio: {l_SvGms}")
-    if l_bpFaced:
-        lines.append(f"Break point salvati: {l_bpSaved}/{l_bpFaced} ({pct(l_bpSaved, l_bpFaced):.1f}%)")
-    elif l_bpSaved:
-        lines.append(f"Break point salvati: {l_bpSaved}/0 (-)")
-    else:
-        lines.append("Break point salvati: n/d (nessuno affrontato)")
-
-    return lines
+    level = display_value(match_row["tourney_level"])
+    match_date = format_tournament_date(match_row["tourney_date"])
+    draw_size = display_value(match_row["draw_size"])
+    match_num = display_value(match_row["match_num"])
+    best_of = display_value(match_row["best_of"])
+    minutes = nums["minutes"]
+    winner_seed = display_value(match_row["winner_seed"], "-")
+    loser_seed = display_value(match_row["loser_seed"], "-")
+    ongoing_flag = nums["ongoing"]
+
+    header_text = MATCH_HEADER_TEMPLATE.format(
+        header=header,
+        winner=winner_name,
+        loser=loser_name,
+        score=score,
+        surface=surface_label,
+        level=level,
+        date_line=f"Data: {match_date}\n" if match_date != "N/A" else "",
+        draw_size=draw_size,
+        match_num=match_num,
+        best_of=best_of,
+        minutes_line=f"Durata: {minutes} minuti\n" if minutes else "",
+        seed_line=(
+            f"Seed: {winner_name} {winner_seed} / {loser_name} {loser_seed}\n"
+            if winner_seed != "-" or loser_seed != "-"
+            else ""
+        ),
+        match_id=display_value(match_row["match_id"]),
+        ongoing_line="\nStato: incontro in corso (dati parziali)" if ongoing_flag else "",
+    )
+    text = "\n".join(
+        (
+            header_text,
+            _format_serve_stats(winner_name, "w_", nums),
+            _format_serve_stats(loser_name, "l_", nums),
+        )
+    )
+    return text.split("\n")
 
 
 def safe_int(value: Any) -> int:
@@ -708,6 +1177,42 @@ def display_value(value: Any, default: str = "N/A") -> str:
     return str(value)
 
 
+# Data dell'ultimo match del giocatore `p` (sottoquery correlata, una ricerca per indice per ruolo).
+PLAYER_LAST_MATCH_SQL = """(
+            SELECT MAX(d) FROM (
+                SELECT MAX(tourney_date) AS d FROM matches WHERE winner_id = p.id
+                UNION ALL
+                SELECT MAX(tourney_date) FROM matches WHERE loser_id = p.id
+            )
+        )"""
+
+# Numero di match giocati dal giocatore `p`, contati separatamente da vincitore e da sconfitto.
+PLAYER_MATCH_COUNT_SQL = """(
+            (SELECT COUNT(*) FROM matches WHERE winner_id = p.id)
+            + (SELECT COUNT(*) FROM matches WHERE loser_id = p.id)
+        )"""
+
+# Ricerca per prefisso e per sottostringa in `_lookup_player`: a parità di nome vince chi
+# ha giocato più di recente (e, per la sottostringa, chi ha più match).
+# Le sottoquery correlate (una per ruolo) sfruttano gli indici su winner_id/loser_id
+# invece di un LEFT JOIN con OR che obbliga a scansionare tutta la tabella matches.
+PLAYER_PREFIX_LOOKUP_SQL = f"""
+        SELECT p.id, p.player_name, {PLAYER_LAST_MATCH_SQL} AS last_match
+        FROM players p
+        WHERE p.player_name LIKE ?
+        ORDER BY (last_match IS NULL) ASC, last_match DESC
+        LIMIT 1
+        """
+PLAYER_SUBSTRING_LOOKUP_SQL = f"""
+        SELECT p.id, p.player_name, {PLAYER_LAST_MATCH_SQL} AS last_match,
+               {PLAYER_MATCH_COUNT_SQL} AS match_count
+        FROM players p
+        WHERE p.player_name LIKE ?
+        ORDER BY (last_match IS NULL) ASC, last_match DESC, match_count DESC
+        LIMIT 1
+        """
+
+
 def validate_and_find_player(
     player_name: str, cursor: sqlite3.Cursor
 ) -> Tuple[Optional[str], Optional[str]]:
@@ -715,6 +1220,70 @@ def validate_and_find_player(
     if not player_name or len(player_name.strip()) < 2:
         return None, None
     clean = player_name.strip()
+    key = clean.translate(_ASCII_LOWER_TABLE)
+    cached = _player_lookup_cache.get(key)
+    if cached is None:
+        cached = _lookup_player(clean, cursor)
+        # Solo i giocatori trovati: uno aggiunto più tardi da db_create.py va cercato di nuovo
+        if cached[0] is not None:
+            _cache_store(_player_lookup_cache, key, cached)
+    return cached
+
+
+# Tabella creata da db_create.py: nome normalizzato (chiave primaria) -> giocatore.
+PLAYER_ALIAS_SQL = "SELECT player_id, canonical FROM player_aliases WHERE norm = ?"
+PLAYER_ALIASES_IN_SQL = "SELECT norm, player_id, canonical FROM player_aliases WHERE norm IN ({placeholders})"
+
+
+def normalize_player_alias(name: str) -> str:
+    """Chiave di ricerca del nome: senza accenti, minuscola, spazi compattati.
+
+    Deve coincidere con `TennisBotDatabaseCreator.normalize_player_alias`.
+    """
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
+
+
+def prefetch_player_aliases(names: Iterable[str], cursor: sqlite3.Cursor) -> None:
+    """Risolve in blocco sulla tabella player_aliases i nomi non ancora in cache.
+
+    I nomi trovati finiscono nella cache di `validate_and_find_player`, che per loro non
+    interroga più il DB; gli altri seguono il percorso normale (LIKE e sottostringa).
+    """
+    pending: Dict[str, Tuple[str, str]] = {}
+    for name in names:
+        clean = str(name or "").strip()
+        if len(clean) < 2:
+            continue
+        key = clean.translate(_ASCII_LOWER_TABLE)
+        if key not in _player_lookup_cache:
+            pending.setdefault(normalize_player_alias(clean), (key, clean))
+    if not pending:
+        return
+    norms = list(pending)
+    # Parametri arrotondati alla potenza di 2, come in get_player_names
+    size = 1 << (len(norms) - 1).bit_length()
+    params = norms + [norms[-1]] * (size - len(norms))
+    try:
+        cursor.execute(PLAYER_ALIASES_IN_SQL.format(placeholders=",".join("?" * size)), params)
+    except sqlite3.OperationalError:
+        # Database creato prima della tabella player_aliases
+        return
+    for norm, player_id, canonical in cursor.fetchall():
+        _cache_store(_player_lookup_cache, pending[norm][0], (player_id, canonical))
+
+
+def _lookup_player(clean: str, cursor: sqlite3.Cursor) -> Tuple[Optional[str], Optional[str]]:
+    """Query di `validate_and_find_player`: alias normalizzato, nome esatto, prefisso, sottostringa."""
+    try:
+        cursor.execute(PLAYER_ALIAS_SQL, (normalize_player_alias(clean),))
+        row = cursor.fetchone()
+    except sqlite3.OperationalError:
+        # Database creato prima della tabella player_aliases: si passa alle query sui nomi
+        row = None
+    if row:
+        return row[0], row[1]
 
     cursor.execute(
         "SELECT id, player_name FROM players WHERE LOWER(player_name) = LOWER(?)",
@@ -724,34 +1293,12 @@ def validate_and_find_player(
     if row:
         return row[0], row[1]
 
-    cursor.execute(
-        """
-        SELECT p.id, p.player_name, MAX(m.tourney_date) AS last_match
-        FROM players p
-        LEFT JOIN matches m ON (p.id = m.winner_id OR p.id = m.loser_id)
-        WHERE LOWER(p.player_name) LIKE LOWER(?)
-        GROUP BY p.id, p.player_name
-        ORDER BY (last_match IS NULL) ASC, last_match DESC
-        LIMIT 1
-        """,
-        (f"{clean}%",),
-    )
+    cursor.execute(PLAYER_PREFIX_LOOKUP_SQL, (f"{clean}%",))
     row = cursor.fetchone()
     if row:
         return row[0], row[1]
 
-    cursor.execute(
-        """
-        SELECT p.id, p.player_name, MAX(m.tourney_date) AS last_match, COUNT(m.match_id) AS match_count
-        FROM players p
-        LEFT JOIN matches m ON (p.id = m.winner_id OR p.id = m.loser_id)
-        WHERE LOWER(p.player_name) LIKE LOWER(?)
-        GROUP BY p.id, p.player_name
-        ORDER BY (last_match IS NULL) ASC, last_match DESC, match_count DESC
-        LIMIT 1
-        """,
-        (f"%{clean}%",),
-    )
+    cursor.execute(PLAYER_SUBSTRING_LOOKUP_SQL, (f"%{clean}%",))
     row = cursor.fetchone()
     if row:
         return row[0], row[1]
@@ -759,154 +1306,381 @@ def validate_and_find_player(
     return None, None
 
 
+def fts_candidates(
+    cursor: sqlite3.Cursor, table: str, column: str, query: str, limit: int
+) -> List[str]:
+    """Restituisce i nomi che condividono più trigrammi con la query, usando l'indice FTS5."""
+    fts_table = FTS_TABLES.get((table, column))
+    q = str(query or "").strip().lower()
+    if not fts_table or len(q) < 3:
+        return []
+    trigrams = dict.fromkeys(q[i : i + 3] for i in range(len(q) - 2))
+    match_expr = " OR ".join('"' + tri.replace('"', '""') + '"' for tri in trigrams)
+    try:
+        cursor.execute(
+            f"SELECT {column} FROM {fts_table} WHERE {fts_table} MATCH ? ORDER BY rank LIMIT ?",
+            (match_expr, limit),
+        )
+    except sqlite3.OperationalError:
+        # DB creato prima dell'indice FTS5 (o SQLite senza tokenizer trigram).
+        return []
+    return [r[0] for r in cursor.fetchall() if r[0]]
+
+
+def fts_prefix_matches(
+    cursor: sqlite3.Cursor, table: str, column: str, query: str, limit: int
+) -> List[str]:
+    """Restituisce i nomi in cui ogni parola della query è prefisso di una parola (ordine bm25)."""
+    fts_table = FTS_TOKEN_TABLES.get((table, column))
+    words = _WORD_RE.findall(str(query or ""))
+    if not fts_table or not words:
+        return []
+    match_expr = " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+    try:
+        cursor.execute(
+            f"SELECT {column} FROM {fts_table} WHERE {fts_table} MATCH ? ORDER BY rank LIMIT ?",
+            (match_expr, limit),
+        )
+    except sqlite3.OperationalError:
+        # DB creato prima dell'indice FTS5.
+        return []
+    return list(dict.fromkeys(r[0] for r in cursor.fetchall() if r[0]))
+
+
+def get_distinct_names(cur: sqlite3.Cursor, table: str, column: str) -> Tuple[str, ...]:
+    """Restituisce (e memorizza per un TTL) i valori distinti non vuoti di `table.column`."""
+    key = (table, column)
+    now = time.monotonic()
+    cached = _distinct_names_cache.get(key)
+    if cached is not None and now - cached[0] < PLAYER_STATS_CACHE_TTL:
+        return cached[1]
+    cur.execute(f"SELECT DISTINCT {column} FROM {table}")
+    names = tuple(r[0] for r in cur.fetchall() if r[0])
+    _distinct_names_cache[key] = (now, names)
+    return names
+
+
 def find_similar_names(
     query: str, table: str, column: str, limit: int = 3
 ) -> List[str]:
     """Restituisce al massimo `limit` nomi simili (LIKE + fuzzy).
     Cerca nel DB nomi che contengono la query; se non trova usa fuzzy matching.
     Restituisce nomi effettivamente presenti nella tabella richiesta.
+    In cache restano solo le liste non vuote: gli errori del DB e le ricerche senza risultati
+    vengono ripetuti, perché db_create.py può aggiungere nomi al DB in uso.
     """
-    import difflib
+    key = (table, column, str(query).translate(_ASCII_LOWER_TABLE), limit)
+    cached = _similar_names_cache.get(key)
+    if cached is not None:
+        return list(cached)
 
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
+        with pooled_cursor() as cur:
+            results = _search_similar_names(cur, query, table, column, limit)
+    except sqlite3.Error:
+        return []
+    if results:
+        _cache_store(_similar_names_cache, key, tuple(results))
+    return results
 
-        cur.execute(
-            f"SELECT DISTINCT {column} FROM {table} WHERE LOWER({column}) LIKE LOWER(?) LIMIT ?",
-            (f"%{query}%", limit),
-        )
-        results = [r[0] for r in cur.fetchall()]
-        if results:
-            conn.close()
-            return results
 
-        cur.execute(f"SELECT DISTINCT {column} FROM {table}")
-        all_names = [r[0] for r in cur.fetchall() if r[0]]
-        conn.close()
+def _search_similar_names(
+    cur: sqlite3.Cursor, query: str, table: str, column: str, limit: int
+) -> List[str]:
+    """Ricerca effettiva di `find_similar_names`: LIKE, shortlist FTS5 e ranking difflib."""
+    import difflib
+
+    cur.execute(
+        f"SELECT DISTINCT {column} FROM {table} WHERE {column} LIKE ? LIMIT ?",
+        (f"%{query}%", limit),
+    )
+    results = [r[0] for r in cur.fetchall()]
+    if results:
+        return results
+
+    # Parole della query come prefissi (ignora accenti e ordine: "cilic marin" -> "Marin Čilić")
+    results = fts_prefix_matches(cur, table, column, query, limit)
+    if results:
+        return results
 
-        last_name_map: Dict[str, List[str]] = {}
-        for name in all_names:
-            parts = re.split(r"\s+", name.strip())
-            last = parts[-1].lower() if parts else name.lower()
-            last_name_map.setdefault(last, []).append(name)
-
-        q = str(query).strip().lower()
-        if " " in q:
-            lc_to_orig = {n.lower(): n for n in all_names}
-            matches = difflib.get_close_matches(q, list(lc_to_orig.keys()), n=limit, cutoff=0.6)
-            if matches:
-                return [lc_to_orig[m] for m in matches]
-
-        scored: List[tuple] = []
-        for last, names in last_name_map.items():
-            ratio = 1.0 - difflib.SequenceMatcher(None, q, last).ratio()
-            scored.append((ratio, last, names))
-        scored.sort(key=lambda x: x[0])
-
-        suggestions: List[str] = []
-        for ratio, _, names in scored:
-            if ratio <= 0.5:
-                for name in names:
-                    if name not in suggestions:
-                        suggestions.append(name)
-                        if len(suggestions) >= limit:
-                            return suggestions
+    # Shortlist dall'indice FTS5 a trigrammi; la scansione completa resta solo come ripiego.
+    all_names = fts_candidates(cur, table, column, query, FTS_SHORTLIST_SIZE)
+    if not all_names:
+        all_names = get_distinct_names(cur, table, column)
 
+    last_name_map: Dict[str, List[str]] = {}
+    for name in all_names:
+        parts = name.split()
+        last = parts[-1].lower() if parts else name.lower()
+        last_name_map.setdefault(last, []).append(name)
+
+    q = str(query).strip().lower()
+    if " " in q:
         lc_to_orig = {n.lower(): n for n in all_names}
-        matches = difflib.get_close_matches(q, list(lc_to_orig.keys()), n=limit, cutoff=0.5)
-        return [lc_to_orig[m] for m in matches]
-    except Exception:
-        return []
+        matches = difflib.get_close_matches(q, list(lc_to_orig.keys()), n=limit, cutoff=0.6)
+        if matches:
+            return [lc_to_orig[m] for m in matches]
+
+    # Un solo SequenceMatcher riutilizzato; i limiti superiori economici (real_quick_ratio,
+    # quick_ratio) scartano i cognomi che non possono superare la soglia senza calcolare ratio().
+    matcher = difflib.SequenceMatcher(None, q, "")
+    scored: List[tuple] = []
+    for last, names in last_name_map.items():
+        matcher.set_seq2(last)
+        if matcher.real_quick_ratio() < 0.5 or matcher.quick_ratio() < 0.5:
+            continue
+        ratio = 1.0 - matcher.ratio()
+        scored.append((ratio, last, names))
+    scored.sort(key=lambda x: x[0])
+
+    suggestions: List[str] = []
+    for ratio, _, names in scored:
+        if ratio <= 0.5:
+            for name in names:
+                if name not in suggestions:
+                    suggestions.append(name)
+                    if len(suggestions) >= limit:
+                        return suggestions
+
+    lc_to_orig = {n.lower(): n for n in all_names}
+    matches = difflib.get_close_matches(q, list(lc_to_orig.keys()), n=limit, cutoff=0.5)
+    return [lc_to_orig[m] for m in matches]
 
 
 def make_intent_payload(intent: str, entities: Dict[str, Any]) -> str:
     """Costruisce il payload Rasa `/intent{"entity":"value"}`."""
     try:
         return f"/{intent}{json.dumps(entities, ensure_ascii=False)}"
-    except Exception:
+    except (TypeError, ValueError):
         return f"/{intent}"
 
 
+# Tabella di traduzione ASCII -> "mathematical bold" (A-Z, a-z, 0-9), costruita una sola volta.
+_BOLD_TABLE = {
+    **{ord(ch): 0x1D400 + i for i, ch in enumerate(string.ascii_uppercase)},
+    **{ord(ch): 0x1D41A + i for i, ch in enumerate(string.ascii_lowercase)},
+    **{ord(ch): 0x1D7CE + i for i, ch in enumerate(string.digits)},
+}
+
+
+# Oltre questa lunghezza la conversione vettoriale con NumPy è più rapida di str.translate.
+BOLD_NUMPY_THRESHOLD = 512
+# Titoli brevi (nomi di tornei e giocatori) già convertiti: si ripetono tra righe e turni.
+_bold_cache: Dict[str, str] = {}
+
+# Intervalli ASCII convertiti e relativo offset verso il blocco "mathematical bold".
+_BOLD_RANGES = (
+    (ord("A"), ord("Z"), 0x1D400 - ord("A")),
+    (ord("a"), ord("z"), 0x1D41A - ord("a")),
+    (ord("0"), ord("9"), 0x1D7CE - ord("0")),
+)
+
+
+def _to_unicode_bold_numpy(text: str) -> str:
+    """Variante di `to_unicode_bold` che opera sui code point come array uint32."""
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).copy()
+    for low, high, offset in _BOLD_RANGES:
+        codes[(codes >= low) & (codes <= high)] += offset
+    return codes.tobytes().decode("utf-32-le")
+
+
 def to_unicode_bold(text: str) -> str:
     """Restituisce il testo in grassetto usando i caratteri Unicode "mathematical bold"."""
-    result: List[str] = []
-    for ch in text:
-        if "A" <= ch <= "Z":
-            result.append(chr(ord(ch) - ord("A") + 0x1D400))
-        elif "a" <= ch <= "z":
-            result.append(chr(ord(ch) - ord("a") + 0x1D41A))
-        elif "0" <= ch <= "9":
-            result.append(chr(ord(ch) - ord("0") + 0x1D7CE))
-        else:
-            result.append(ch)
-    return "".join(result)
+    if len(text) > BOLD_NUMPY_THRESHOLD:
+        return _to_unicode_bold_numpy(text)
+    bold = _bold_cache.get(text)
+    if bold is None:
+        bold = text.translate(_BOLD_TABLE)
+        _cache_store(_bold_cache, text, bold)
+    return bold
+
+
+# Etichette fisse delle risposte, convertite in grassetto una sola volta all'import.
+BOLD_LABELS: Dict[str, str] = {
+    label: to_unicode_bold(label)
+    for label in (
+        "Partite analizzate",
+        "Vittorie",
+        "Sconfitte",
+        "Win rate",
+        "Ace totali",
+        "Doppi falli totali",
+        "Prime in",
+        "Punti vinti con la 1a",
+        "Punti vinti con la 2a",
+        "Break point salvati",
+        "Service game totali",
+        "Partite con tie-break",
+        "Finali giocate",
+        "Titoli",
+        "Match con ritiro/walkover",
+        "vinti",
+        "persi",
+        "Per superficie:",
+        "Migliori tornei:",
+        "Performance per anno:",
+        "Partite totali",
+        "Per anno (ultimi 5):",
+        "Ultimi incontri:",
+        "Ultimo campione",
+        "Ultime partite registrate:",
+        "Altri match trovati:",
+        "Ultimi match registrati:",
+        "Tornei in corso:",
+    )
+}
+
 
+def get_match_display_info(match_row: Any, names: Dict[str, str]) -> Dict[str, Any]:
+    """Converte la riga del match in un dizionario leggibile.
 
-def get_match_display_info(match_row: Tuple[Any, ...], cursor: sqlite3.Cursor) -> Dict[str, Any]:
-    """Converte la tupla grezza del match in un dizionario leggibile."""
-    if not match_row or len(match_row) < 34:
+    La riga (sqlite3.Row o dict) deve contenere almeno MATCH_DISPLAY_COLUMNS;
+    `names` è la mappa id -> nome prodotta da `get_match_player_names`.
+    """
+    if not match_row:
         return {}
 
-    (
-        match_id,
-        tourney_name,
-        surface,
-        draw_size,
-        tourney_level,
-        tourney_date,
-        match_num,
-        winner_id,
-        loser_id,
-        winner_seed,
-        loser_seed,
-        score,
-        best_of,
-        round_name,
-        minutes,
-        w_ace,
-        w_df,
-        w_svpt,
-        w_1stIn,
-        w_1stWon,
-        w_2ndWon,
-        w_SvGms,
-        w_bpSaved,
-        w_bpFaced,
-        l_ace,
-        l_df,
-        l_svpt,
-        l_1stIn,
-        l_1stWon,
-        l_2ndWon,
-        l_SvGms,
-        l_bpSaved,
-        l_bpFaced,
-        ongoing,
-    ) = match_row
-
-    winner_name = get_player_name_by_id(winner_id, cursor)
-    loser_name = get_player_name_by_id(loser_id, cursor)
+    tourney_date = match_row["tourney_date"]
+    winner_id = match_row["winner_id"]
+    loser_id = match_row["loser_id"]
+    winner_name = names.get(winner_id, winner_id) if winner_id else "Unknown"
+    loser_name = names.get(loser_id, loser_id) if loser_id else "Unknown"
     year = str(tourney_date)[:4] if tourney_date else "N/A"
 
     return {
-        "match_id": match_id,
-        "tournament": tourney_name,
-        "surface": surface,
-        "level": tourney_level,
+        "match_id": match_row["match_id"],
+        "tournament": match_row["tourney_name"],
+        "surface": match_row["surface"],
+        "level": match_row["tourney_level"],
         "date": format_tournament_date(tourney_date),
         "year": year,
         "winner": winner_name,
         "loser": loser_name,
         "winner_id": winner_id,
         "loser_id": loser_id,
-        "score": score,
-        "round": round_name,
-        "minutes": minutes or 0,
-        "ongoing": bool(ongoing),
+        "score": match_row["score"],
+        "round": match_row["round"],
+        "minutes": match_row["minutes"] or 0,
+        "ongoing": bool(match_row["ongoing"]),
+    }
+
+
+def _group_win_counts(keys: Sequence[str], won: np.ndarray) -> Dict[str, Dict[str, int]]:
+    """Conta match e vittorie per chiave, mantenendo l'ordine di prima apparizione delle chiavi."""
+    if not keys:
+        return {}
+    uniques, first_index, inverse = np.unique(
+        np.array(keys, dtype=object), return_index=True, return_inverse=True
+    )
+    matches = np.bincount(inverse, minlength=len(uniques))
+    wins = np.bincount(inverse, weights=won, minlength=len(uniques))
+    return {
+        uniques[k]: {"matches": int(matches[k]), "wins": int(wins[k])}
+        for k in np.argsort(first_index).tolist()
+    }
+
+
+def compute_player_stats(
+    cursor: sqlite3.Cursor,
+    player_id: str,
+    year_filter: Optional[str],
+    surface_filter: Optional[str],
+    tournament_filter: Optional[str],
+) -> Dict[str, Any]:
+    """Aggrega le statistiche di un giocatore sui match (senza duplicati) che rispettano i filtri."""
+    mask, filter_params = match_filter_params(year_filter, surface_filter, tournament_filter)
+    # Il primo parametro è quello del flag `winner_id = ?` nella lista delle colonne
+    cursor.execute(PLAYER_STATS_QUERIES[mask], [player_id, player_id, player_id] + filter_params)
+    match_rows = cursor.fetchall()
+
+    total = len(match_rows)
+    if total == 0:
+        return {"total": 0}
+
+    # Flag e statistiche al servizio come matrice di interi (match x colonne): per ogni match
+    # si sceglie il lato del giocatore e si somma per colonna in un solo passaggio.
+    numeric = np.array([row[PLAYER_STATS_NUMERIC_OFFSET:] for row in match_rows], dtype=np.int64)
+    n_flags = len(PLAYER_STATS_FLAGS_SQL)
+    is_winner, retired, tie_break, finals = (numeric[:, k].astype(bool) for k in range(n_flags))
+    wins = int(is_winner.sum())
+    serve = numeric[:, n_flags:]
+    n_fields = len(SERVE_STAT_FIELDS)
+    own_serve = np.where(is_winner[:, None], serve[:, :n_fields], serve[:, n_fields:]).sum(axis=0)
+    (
+        sum_aces,
+        sum_dfs,
+        sum_svpt,
+        sum_1st_in,
+        sum_1st_won,
+        sum_2nd_won,
+        sum_svgms,
+        sum_bp_saved,
+        sum_bp_faced,
+    ) = (int(value) for value in own_serve)
+
+    retires_total = int(retired.sum())
+    retires_wins = int((retired & is_winner).sum())
+    retires_losses = retires_total - retires_wins
+    tb_matches = int(tie_break.sum())
+    finals_played = int(finals.sum())
+    titles_won = int((finals & is_winner).sum())
+
+    # Ripartizioni per superficie, torneo e anno: chiavi normalizzate in Python, conteggi con NumPy.
+    surface_keys = [(match["surface"] or "").strip() or "N/A" for match in match_rows]
+    tournament_keys = [(match["tourney_name"] or "Sconosciuto").strip() for match in match_rows]
+    surface_stats = _group_win_counts(surface_keys, is_winner)
+    tournament_stats = _group_win_counts(tournament_keys, is_winner)
+
+    year_stats: Dict[str, Dict[str, int]] = {}
+    if not year_filter:
+        years = [str(match["tourney_date"] or "")[:4] for match in match_rows]
+        year_mask = np.array([len(year) == 4 and year.isdigit() for year in years], dtype=bool)
+        year_stats = _group_win_counts(
+            [year for year, valid in zip(years, year_mask.tolist()) if valid], is_winner[year_mask]
+        )
+
+    return {
+        "total": total,
+        "wins": wins,
+        "sum_aces": sum_aces,
+        "sum_dfs": sum_dfs,
+        "sum_svpt": sum_svpt,
+        "sum_1st_in": sum_1st_in,
+        "sum_1st_won": sum_1st_won,
+        "sum_2nd_won": sum_2nd_won,
+        "sum_svgms": sum_svgms,
+        "sum_bp_saved": sum_bp_saved,
+        "sum_bp_faced": sum_bp_faced,
+        "retires_total": retires_total,
+        "retires_wins": retires_wins,
+        "retires_losses": retires_losses,
+        "tb_matches": tb_matches,
+        "finals_played": finals_played,
+        "titles_won": titles_won,
+        "surface_stats": surface_stats,
+        "tournament_stats": tournament_stats,
+        "year_stats": year_stats,
     }
 
 
+def get_player_stats(
+    cursor: sqlite3.Cursor,
+    player_id: str,
+    year_filter: Optional[str],
+    surface_filter: Optional[str],
+    tournament_filter: Optional[str],
+) -> Dict[str, Any]:
+    """Versione memorizzata di `compute_player_stats`, valida per PLAYER_STATS_CACHE_TTL secondi."""
+    key = (str(player_id), year_filter, surface_filter, tournament_filter)
+    now = time.monotonic()
+    cached = _player_stats_cache.get(key)
+    if cached is not None and now - cached[0] < PLAYER_STATS_CACHE_TTL:
+        return cached[1]
+    stats = compute_player_stats(cursor, player_id, year_filter, surface_filter, tournament_filter)
+    _cache_store(_player_stats_cache, key, (now, stats))
+    return stats
+
+
 # ==============================================================================
 # Actions
 # ==============================================================================
@@ -929,8 +1703,9 @@ class ActionPlayerInfo(Action):
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
         entities = tracker.latest_message.get("entities", [])
-        players = [e.get("value") for e in entities if e.get("entity") == "player"]
-        raw_name = players[0] if players else extract_name_from_text_fixed(tracker.latest_message.get("text", ""))
+        raw_name = next((e.get("value") for e in entities if e.get("entity") == "player"), None)
+        if raw_name is None:
+            raw_name = extract_name_from_text_fixed(tracker.latest_message.get("text", ""))
         if not raw_name:
             raw_name = tracker.get_slot("player_name")
 
@@ -938,132 +1713,108 @@ class ActionPlayerInfo(Action):
             dispatcher.utter_message(response="utter_ask_player_name")
             return []
 
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            player_id, canonical_name = validate_and_find_player(raw_name, cur)
-            if not player_id:
-                similar = find_similar_names(raw_name, "players", "player_name", limit=3)
-                if similar:
-                    buttons = [
-                        {"title": s, "payload": make_intent_payload("player_info", {"player": s})}
-                        for s in similar
-                    ]
-                    dispatcher.utter_message(
-                        text=f"Giocatore '{raw_name}' non trovato. Forse cercavi:",
-                        buttons=buttons,
-                    )
-                else:
-                    dispatcher.utter_message(text=f"Giocatore '{raw_name}' non trovato.")
-                    dispatcher.utter_message(response="utter_ask_player_name")
-                return []
-
-            cur.execute(
-                """
-                SELECT id, player_name, atpname, birthdate, weight, height,
-                       turned_pro, birthplace, coaches, hand, backhand, ioc, active
-                FROM players
-                WHERE id = ?
-                """,
-                (player_id,),
-            )
-            row = cur.fetchone()
-
-            lines: List[str] = []
-            if row:
-                (
-                    _pid,
-                    name,
-                    _atpname,
-                    birthdate,
-                    weight,
-                    height,
-                    turned_pro,
-                    birthplace,
-                    coaches,
-                    hand,
-                    backhand,
-                    ioc,
-                    active,
-                ) = row
-                display_name = str(name or canonical_name or raw_name or "").strip()
-                if display_name:
-                    lines.append(to_unicode_bold(display_name))
-                if birthplace:
-                    lines.append(f"Nato: {birthplace}")
-                if birthdate:
-                    lines.append(f"Data di nascita: {format_tournament_date(str(birthdate))}")
-                if height:
-                    lines.append(f"Altezza: {height} cm")
-                if weight:
-                    lines.append(f"Peso: {weight} kg")
-                if ioc:
-                    lines.append(f"Nazionalita: {ioc_to_flag(ioc)}")
-                if coaches:
-                    coach_text = str(coaches).strip()
-                    if coach_text:
-                        lines.append(f"Allenatore: {coach_text}")
-                tp_year = normalize_year_field(turned_pro)
-                if tp_year:
-                    lines.append(f"Professionista dal: {tp_year}")
-                if hand:
-                    hand_str = str(hand).strip().upper()
-                    if hand_str == "R":
-                        lines.append("Mano: destra")
-                    elif hand_str == "L":
-                        lines.append("Mano: sinistra")
+            with pooled_cursor() as cur:
+                player_id, canonical_name = validate_and_find_player(raw_name, cur)
+                if not player_id:
+                    similar = find_similar_names(raw_name, "players", "player_name", limit=3)
+                    if similar:
+                        buttons = [
+                            {"title": s, "payload": make_intent_payload("player_info", {"player": s})}
+                            for s in similar
+                        ]
+                        dispatcher.utter_message(
+                            text=f"Giocatore '{raw_name}' non trovato. Forse cercavi:",
+                            buttons=buttons,
+                        )
                     else:
-                        lines.append(f"Mano: {hand}")
-                if backhand:
-                    back = str(backhand).strip().upper()
-                    if back == "2H":
-                        lines.append("Rovescio: due mani")
-                    elif back == "1H":
-                        lines.append("Rovescio: una mano")
-                if active is not None:
-                    lines.append(f"Stato: {'Attivo' if int(active) == 1 else 'Non attivo'}")
-
-            cur.execute(
-                """
-                SELECT *
-                FROM matches
-                WHERE winner_id = ? OR loser_id = ?
-                ORDER BY tourney_date DESC, match_id DESC
-                LIMIT 1
-                """,
-                (player_id, player_id),
-            )
-            last_match = cur.fetchone()
-            if last_match:
-                info = get_match_display_info(last_match, cur)
-                result = "W" if str(info.get("winner_id")) == str(player_id) else "L"
-                opponent = info["loser"] if result == "W" else info["winner"]
-                lines.append("")
-                lines.append("Ultima partita:")
-                lines.append(f"{info['tournament']} ({info['year']}) - {result} - {info.get('round') or 'N/A'}")
-                lines.append(f"vs {opponent} - {info.get('score') or 'N/A'}")
-
-            if lines:
-                lines.append("")
-                lines.append("Se vuoi possiamo consultare le sue statistiche o fare un confronto con un altro giocatore ATP!")
-
-            dispatcher.utter_message(text="\n".join(lines))
-            return [
-                SlotSet("player_name", canonical_name),
-                SlotSet("player1", canonical_name),
-                SlotSet("player2", None),
-                SlotSet("year", None),
-                SlotSet("surface", None),
-                SlotSet("tournament_name", None),
-            ]
-        except Exception as exc:
+                        dispatcher.utter_message(text=f"Giocatore '{raw_name}' non trovato.")
+                        dispatcher.utter_message(response="utter_ask_player_name")
+                    return []
+
+                cur.execute(PLAYER_INFO_SQL, (player_id, player_id, player_id))
+                row = cur.fetchone()
+
+                lines: List[str] = []
+                if row:
+                    (
+                        _pid,
+                        name,
+                        _atpname,
+                        birthdate,
+                        weight,
+                        height,
+                        turned_pro,
+                        birthplace,
+                        coaches,
+                        hand,
+                        backhand,
+                        ioc,
+                        active,
+                    ) = row[:len(PLAYER_INFO_COLUMNS)]
+                    display_name = str(name or canonical_name or raw_name or "").strip()
+                    if display_name:
+                        lines.append(to_unicode_bold(display_name))
+                    if birthplace:
+                        lines.append(f"Nato: {birthplace}")
+                    if birthdate:
+                        lines.append(f"Data di nascita: {format_tournament_date(str(birthdate))}")
+                    if height:
+                        lines.append(f"Altezza: {height} cm")
+                    if weight:
+                        lines.append(f"Peso: {weight} kg")
+                    if ioc:
+                        lines.append(f"Nazionalita: {ioc_to_flag(ioc)}")
+                    if coaches:
+                        coach_text = str(coaches).strip()
+                        if coach_text:
+                            lines.append(f"Allenatore: {coach_text}")
+                    tp_year = normalize_year_field(turned_pro)
+                    if tp_year:
+                        lines.append(f"Professionista dal: {tp_year}")
+                    if hand:
+                        hand_str = str(hand).strip().upper()
+                        if hand_str == "R":
+                            lines.append("Mano: destra")
+                        elif hand_str == "L":
+                            lines.append("Mano: sinistra")
+                        else:
+                            lines.append(f"Mano: {hand}")
+                    if backhand:
+                        back = str(backhand).strip().upper()
+                        if back == "2H":
+                            lines.append("Rovescio: due mani")
+                        elif back == "1H":
+                            lines.append("Rovescio: una mano")
+                    if active is not None:
+                        lines.append(f"Stato: {'Attivo' if int(active) == 1 else 'Non attivo'}")
+
+                last_match = row if row and row["match_id"] is not None else None
+                if last_match:
+                    info = get_match_display_info(last_match, get_match_player_names([last_match], cur))
+                    result = "W" if info.get("winner_id") == player_id else "L"
+                    opponent = info["loser"] if result == "W" else info["winner"]
+                    lines.append("")
+                    lines.append("Ultima partita:")
+                    lines.append(f"{info['tournament']} ({info['year']}) - {result} - {info.get('round') or 'N/A'}")
+                    lines.append(f"vs {opponent} - {info.get('score') or 'N/A'}")
+
+                if lines:
+                    lines.append("")
+                    lines.append("Se vuoi possiamo consultare le sue statistiche o fare un confronto con un altro giocatore ATP!")
+
+                dispatcher.utter_message(text="\n".join(lines))
+                return [
+                    SlotSet("player_name", canonical_name),
+                    SlotSet("player1", canonical_name),
+                    SlotSet("player2", None),
+                    SlotSet("year", None),
+                    SlotSet("surface", None),
+                    SlotSet("tournament_name", None),
+                ]
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel recuperare info giocatore: {exc}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
 
 class ActionPlayerStats(Action):
@@ -1084,8 +1835,7 @@ class ActionPlayerStats(Action):
     ) -> List[Dict[Text, Any]]:
         # Contesto comune che ci permette di capire se l'utente sta filtrando anno/superficie/torneo
         ctx = build_filter_context(tracker)
-        entities = ctx.entities
-        players = [e.get("value") for e in entities if e.get("entity") == "player"]
+        players = ctx.players
         raw_name = players[0] if players else tracker.get_slot("player_name")
 
         if (
@@ -1097,9 +1847,7 @@ class ActionPlayerStats(Action):
 
         if not raw_name:
             dispatcher.utter_message(response="utter_ask_player_name")
-            events: List[Any] = ctx.active_slot_events()
-            events.append(FollowupAction("action_listen"))
-            return events
+            return [*ctx.active_slot_events(), FollowupAction("action_listen")]
 
         year_filter = ctx.year
         surface_filter = ctx.surface
@@ -1108,267 +1856,179 @@ class ActionPlayerStats(Action):
         has_surface = ctx.explicit_surface
         has_tournament = ctx.explicit_tournament
 
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            player_id, canonical_name = validate_and_find_player(raw_name, cur)
-            if not player_id:
-                similar = find_similar_names(raw_name, "players", "player_name", limit=3)
-                if similar:
-                    buttons = [
-                        {"title": s, "payload": make_intent_payload("player_stats", {"player": s})}
-                        for s in similar
-                    ]
-                    dispatcher.utter_message(
-                        text=f"Giocatore '{raw_name}' non trovato. Forse cercavi:",
-                        buttons=buttons,
+            with pooled_cursor() as cur:
+                player_id, canonical_name = validate_and_find_player(raw_name, cur)
+                if not player_id:
+                    similar = find_similar_names(raw_name, "players", "player_name", limit=3)
+                    if similar:
+                        buttons = [
+                            {"title": s, "payload": make_intent_payload("player_stats", {"player": s})}
+                            for s in similar
+                        ]
+                        dispatcher.utter_message(
+                            text=f"Giocatore '{raw_name}' non trovato. Forse cercavi:",
+                            buttons=buttons,
+                        )
+                    else:
+                        dispatcher.utter_message(text=f"Giocatore '{raw_name}' non trovato.")
+                        dispatcher.utter_message(response="utter_ask_player_name")
+                    events_nf: List[Any] = ctx.slot_events()
+                    if not events_nf and (ctx.year or ctx.surface or ctx.tournament):
+                        events_nf = ctx.active_slot_events()
+                    return [*events_nf, FollowupAction("action_listen")]
+
+                stats = get_player_stats(cur, player_id, year_filter, surface_filter, tournament_filter)
+                total = stats["total"]
+                filters_desc_full = ctx.describe()
+                if total == 0:
+                    message = f"Nessun dato disponibile per {canonical_name}."
+                    if filters_desc_full:
+                        message += "\nFiltri usati: " + ", ".join(filters_desc_full)
+                    dispatcher.utter_message(text=message)
+                    reset_events: List[Any] = [SlotSet("player_name", canonical_name)]
+                    if has_year or year_filter or ctx.slot_year:
+                        reset_events.append(SlotSet("year", None))
+                    if has_surface or surface_filter or ctx.slot_surface:
+                        reset_events.append(SlotSet("surface", None))
+                    if has_tournament or tournament_filter or ctx.slot_tournament:
+                        reset_events.append(SlotSet("tournament_name", None))
+                    reset_events.extend((SlotSet(LAST_CONTEXT_SLOT, None), FollowupAction("action_listen")))
+                    return reset_events
+
+                wins = stats["wins"]
+                losses = total - wins
+                win_rate = (wins / total * 100.0) if total else 0.0
+
+                title = f"Statistiche {canonical_name}"
+                subtitle_parts: List[str] = []
+                if year_filter:
+                    subtitle_parts.append(str(year_filter))
+                if surface_filter:
+                    subtitle_parts.append(SURFACE_LABELS.get(surface_filter, surface_filter))
+                if tournament_filter:
+                    subtitle_parts.append(str(tournament_filter))
+                if subtitle_parts:
+                    title += " (" + ", ".join(subtitle_parts) + ")"
+
+                sum_aces = stats["sum_aces"]
+                sum_dfs = stats["sum_dfs"]
+                sum_svpt = stats["sum_svpt"]
+                sum_1st_in = stats["sum_1st_in"]
+                sum_1st_won = stats["sum_1st_won"]
+                sum_2nd_won = stats["sum_2nd_won"]
+                sum_svgms = stats["sum_svgms"]
+                sum_bp_saved = stats["sum_bp_saved"]
+                sum_bp_faced = stats["sum_bp_faced"]
+                retires_total = stats["retires_total"]
+                retires_wins = stats["retires_wins"]
+                retires_losses = stats["retires_losses"]
+                tb_matches = stats["tb_matches"]
+                finals_played = stats["finals_played"]
+                titles_won = stats["titles_won"]
+                surface_stats = stats["surface_stats"]
+                tournament_stats = stats["tournament_stats"]
+                year_stats = stats["year_stats"]
+
+                first_in_pct = (sum_1st_in / sum_svpt * 100.0) if sum_svpt else 0.0
+                first_won_pct = (sum_1st_won / sum_1st_in * 100.0) if sum_1st_in else 0.0
+                second_won_pct = (sum_2nd_won / (sum_svpt - sum_1st_in) * 100.0) if (sum_svpt - sum_1st_in) else 0.0
+                bp_saved_pct = (sum_bp_saved / sum_bp_faced * 100.0) if sum_bp_faced else 0.0
+
+                lines: List[str] = [
+                    to_unicode_bold(title),
+                    "",
+                    f"{BOLD_LABELS['Partite analizzate']}: {total}",
+                    f"{BOLD_LABELS['Vittorie']}: {wins}",
+                    f"{BOLD_LABELS['Sconfitte']}: {losses}",
+                    f"{BOLD_LABELS['Win rate']}: {win_rate:.1f}%",
+                    "",
+                    f"{BOLD_LABELS['Ace totali']}: {sum_aces} (media {sum_aces / total:.2f}/match)",
+                    f"{BOLD_LABELS['Doppi falli totali']}: {sum_dfs} (media {sum_dfs / total:.2f}/match)",
+                    f"{BOLD_LABELS['Prime in']}: {first_in_pct:.1f}%",
+                    f"{BOLD_LABELS['Punti vinti con la 1a']}: {first_won_pct:.1f}%",
+                    f"{BOLD_LABELS['Punti vinti con la 2a']}: {second_won_pct:.1f}%",
+                ]
+                if sum_bp_faced > 0:
+                    lines.append(
+                        f"{BOLD_LABELS['Break point salvati']}: "
+                        f"{sum_bp_saved}/{sum_bp_faced} ({bp_saved_pct:.1f}%)"
+                    )
+                lines.extend((
+                    f"{BOLD_LABELS['Service game totali']}: {sum_svgms}",
+                    f"{BOLD_LABELS['Partite con tie-break']}: {tb_matches}",
+                    f"{BOLD_LABELS['Finali giocate']}: {finals_played}",
+                    f"{BOLD_LABELS['Titoli']}: {titles_won}",
+                ))
+                if retires_total:
+                    lines.append(
+                        f"{BOLD_LABELS['Match con ritiro/walkover']}: {retires_total} "
+                        f"({BOLD_LABELS['vinti']}: {retires_wins}, {BOLD_LABELS['persi']}: {retires_losses})"
                     )
-                else:
-                    dispatcher.utter_message(text=f"Giocatore '{raw_name}' non trovato.")
-                    dispatcher.utter_message(response="utter_ask_player_name")
-                events_nf: List[Any] = ctx.slot_events()
-                if not events_nf and (ctx.year or ctx.surface or ctx.tournament):
-                    events_nf = ctx.active_slot_events()
-                events_nf.append(FollowupAction("action_listen"))
-                return events_nf
-
-            matches_query = (
-                "SELECT match_id, tourney_name, surface, tourney_date, winner_id, loser_id, score, round, minutes, "
-                "w_ace, w_df, w_svpt, w_1stIn, w_1stWon, w_2ndWon, w_SvGms, w_bpSaved, w_bpFaced, "
-                "l_ace, l_df, l_svpt, l_1stIn, l_1stWon, l_2ndWon, l_SvGms, l_bpSaved, l_bpFaced "
-                "FROM matches WHERE (winner_id = ? OR loser_id = ?)"
-            )
-            params: List[Any] = [player_id, player_id]
-            if year_filter:
-                matches_query += " AND tourney_date LIKE ?"
-                params.append(f"{year_filter}%")
-            if surface_filter:
-                matches_query += " AND surface = ?"
-                params.append(surface_filter)
-            if tournament_filter:
-                matches_query += " AND LOWER(tourney_name) LIKE LOWER(?)"
-                params.append(f"%{tournament_filter}%")
-            matches_query += " ORDER BY tourney_date DESC, match_id DESC"
-
-            match_rows = deduplicate_matches(
-                fetch_rows_as_dicts(cur, matches_query, params, include_raw=False)
-            )
 
-            total = len(match_rows)
-            filters_desc_full = ctx.describe()
-            if total == 0:
-                message = f"Nessun dato disponibile per {canonical_name}."
-                if filters_desc_full:
-                    message += "\nFiltri usati: " + ", ".join(filters_desc_full)
-                dispatcher.utter_message(text=message)
-                reset_events: List[Any] = [SlotSet("player_name", canonical_name)]
-                if has_year or year_filter or ctx.slot_year:
-                    reset_events.append(SlotSet("year", None))
-                if has_surface or surface_filter or ctx.slot_surface:
-                    reset_events.append(SlotSet("surface", None))
-                if has_tournament or tournament_filter or ctx.slot_tournament:
-                    reset_events.append(SlotSet("tournament_name", None))
-                reset_events.append(SlotSet(LAST_CONTEXT_SLOT, None))
-                reset_events.append(FollowupAction("action_listen"))
-                return reset_events
-
-            player_id_str = str(player_id)
-            wins = sum(1 for row in match_rows if str(row["winner_id"]) == player_id_str)
-            losses = total - wins
-            win_rate = (wins / total * 100.0) if total else 0.0
-
-            title = f"Statistiche {canonical_name}"
-            subtitle_parts: List[str] = []
-            if year_filter:
-                subtitle_parts.append(str(year_filter))
-            if surface_filter:
-                subtitle_parts.append(SURFACE_LABELS.get(surface_filter, surface_filter))
-            if tournament_filter:
-                subtitle_parts.append(str(tournament_filter))
-            if subtitle_parts:
-                title += " (" + ", ".join(subtitle_parts) + ")"
-
-            sum_aces = sum_dfs = sum_svpt = 0
-            sum_1st_in = sum_1st_won = sum_2nd_won = 0
-            sum_svgms = sum_bp_saved = sum_bp_faced = 0
-            minutes_total = 0
-            minutes_count = 0
-            retires_total = retires_wins = retires_losses = 0
-            finals_played = titles_won = tb_matches = 0
-            surface_stats: Dict[str, Dict[str, int]] = {}
-            tournament_stats: Dict[str, Dict[str, int]] = {}
-            year_stats: Dict[str, Dict[str, int]] = {}
-
-            for match in match_rows:
-                is_winner = str(match["winner_id"]) == player_id_str
-
-                surface_code = (match.get("surface") or "").strip()
-                if not surface_code:
-                    surface_code = "N/A"
-                s_entry = surface_stats.setdefault(surface_code, {"matches": 0, "wins": 0})
-                s_entry["matches"] += 1
-                if is_winner:
-                    s_entry["wins"] += 1
-
-                tournament_name = (match.get("tourney_name") or "Sconosciuto").strip()
-                t_entry = tournament_stats.setdefault(tournament_name, {"matches": 0, "wins": 0})
-                t_entry["matches"] += 1
-                if is_winner:
-                    t_entry["wins"] += 1
-
-                if not year_filter:
-                    raw_date = str(match.get("tourney_date") or "")
-                    year = raw_date[:4] if len(raw_date) >= 4 else ""
-                    if year.isdigit():
-                        y_entry = year_stats.setdefault(year, {"matches": 0, "wins": 0})
-                        y_entry["matches"] += 1
-                        if is_winner:
-                            y_entry["wins"] += 1
-
-                ace = safe_int(match["w_ace"] if is_winner else match["l_ace"])
-                df = safe_int(match["w_df"] if is_winner else match["l_df"])
-                svpt = safe_int(match["w_svpt"] if is_winner else match["l_svpt"])
-                first_in = safe_int(match["w_1stIn"] if is_winner else match["l_1stIn"])
-                first_won = safe_int(match["w_1stWon"] if is_winner else match["l_1stWon"])
-                second_won = safe_int(match["w_2ndWon"] if is_winner else match["l_2ndWon"])
-                svgms = safe_int(match["w_SvGms"] if is_winner else match["l_SvGms"])
-                bp_saved = safe_int(match["w_bpSaved"] if is_winner else match["l_bpSaved"])
-                bp_faced = safe_int(match["w_bpFaced"] if is_winner else match["l_bpFaced"])
-
-                sum_aces += ace
-                sum_dfs += df
-                sum_svpt += svpt
-                sum_1st_in += first_in
-                sum_1st_won += first_won
-                sum_2nd_won += second_won
-                sum_svgms += svgms
-                sum_bp_saved += bp_saved
-                sum_bp_faced += bp_faced
-
-                minutes = safe_int(match.get("minutes"))
-                if minutes:
-                    minutes_total += minutes
-                    minutes_count += 1
-
-                score = str(match.get("score") or "")
-                if "RET" in score.upper() or "W/O" in score.upper():
-                    retires_total += 1
-                    if is_winner:
-                        retires_wins += 1
-                    else:
-                        retires_losses += 1
-                if "TB" in score.upper() or "7-" in score:
-                    tb_matches += 1
-                if str(match.get("round") or "").upper() in {"F", "FIN", "FINAL"}:
-                    finals_played += 1
-                    if is_winner:
-                        titles_won += 1
-
-            first_in_pct = (sum_1st_in / sum_svpt * 100.0) if sum_svpt else 0.0
-            first_won_pct = (sum_1st_won / sum_1st_in * 100.0) if sum_1st_in else 0.0
-            second_won_pct = (sum_2nd_won / (sum_svpt - sum_1st_in) * 100.0) if (sum_svpt - sum_1st_in) else 0.0
-            bp_saved_pct = (sum_bp_saved / sum_bp_faced * 100.0) if sum_bp_faced else 0.0
-
-            lines: List[str] = [
-                to_unicode_bold(title),
-                "",
-                to_unicode_bold("Partite analizzate") + f": {total}",
-                to_unicode_bold("Vittorie") + f": {wins}",
-                to_unicode_bold("Sconfitte") + f": {losses}",
-                to_unicode_bold("Win rate") + f": {win_rate:.1f}%",
-                "",
-                to_unicode_bold("Ace totali") + f": {sum_aces} (media {sum_aces / total:.2f}/match)",
-                to_unicode_bold("Doppi falli totali") + f": {sum_dfs} (media {sum_dfs / total:.2f}/match)",
-                to_unicode_bold("Prime in") + f": {first_in_pct:.1f}%",
-                to_unicode_bold("Punti vinti con la 1a") + f": {first_won_pct:.1f}%",
-                to_unicode_bold("Punti vinti con la 2a") + f": {second_won_pct:.1f}%",
-            ]
-            if sum_bp_faced > 0:
-                lines.append(
-                    to_unicode_bold("Break point salvati")
-                    + f": {sum_bp_saved}/{sum_bp_faced} ({bp_saved_pct:.1f}%)"
+                sorted_surface = sorted(
+                    surface_stats.items(), key=lambda item: item[1]["matches"], reverse=True
                 )
-            lines.append(to_unicode_bold("Service game totali") + f": {sum_svgms}")
-            lines.append(to_unicode_bold("Partite con tie-break") + f": {tb_matches}")
-            lines.append(to_unicode_bold("Finali giocate") + f": {finals_played}")
-            lines.append(to_unicode_bold("Titoli") + f": {titles_won}")
-            if retires_total:
-                lines.append(
-                    to_unicode_bold("Match con ritiro/walkover")
-                    + f": {retires_total} ("
-                    + to_unicode_bold("vinti")
-                    + f": {retires_wins}, "
-                    + to_unicode_bold("persi")
-                    + f": {retires_losses})"
+                if sorted_surface:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Per superficie:"])
+                    for surface_code, data in sorted_surface:
+                        matches_surface = data["matches"]
+                        wins_surface = data["wins"]
+                        losses_surface = matches_surface - wins_surface
+                        rate_surface = (wins_surface / matches_surface * 100.0) if matches_surface else 0.0
+                        label = SURFACE_LABELS.get(surface_code, surface_code)
+                        lines.append(
+                            f"- {label}: {wins_surface}W-{losses_surface}L ({rate_surface:.1f}%)"
+                        )
+
+                sorted_tournaments = heapq.nlargest(
+                    5,
+                    tournament_stats.items(),
+                    key=lambda item: (item[1]["wins"], item[1]["matches"]),
                 )
+                if sorted_tournaments:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Migliori tornei:"])
+                    for t_name, data in sorted_tournaments:
+                        matches_t = data["matches"]
+                        wins_t = data["wins"]
+                        losses_t = matches_t - wins_t
+                        rate_t = (wins_t / matches_t * 100.0) if matches_t else 0.0
+                        lines.append(f"- {t_name}: {wins_t}W-{losses_t}L ({rate_t:.1f}%)")
+
+                if not year_filter and year_stats:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Performance per anno:"])
+                    for year, data in heapq.nlargest(5, year_stats.items(), key=lambda item: item[0]):
+                        matches_y = data["matches"]
+                        wins_y = data["wins"]
+                        losses_y = matches_y - wins_y
+                        rate_y = (wins_y / matches_y * 100.0) if matches_y else 0.0
+                        lines.append(f"- {year}: {wins_y}W-{losses_y}L ({rate_y:.1f}%)")
+
+                if not (has_year or has_surface or has_tournament):
+                    lines.append("")
+                    lines.append("Consiglio: puoi filtrare per anno, superficie o torneo.")
+                    lines.append("Esempi: 'nel 2024', 'su erba', 'a Wimbledon', 'su erba nel 2022'.")
 
-            sorted_surface = sorted(
-                surface_stats.items(), key=lambda item: item[1]["matches"], reverse=True
-            )
-            if sorted_surface:
-                lines.append("")
-                lines.append(to_unicode_bold("Per superficie:"))
-                for surface_code, data in sorted_surface:
-                    matches_surface = data["matches"]
-                    wins_surface = data["wins"]
-                    losses_surface = matches_surface - wins_surface
-                    rate_surface = (wins_surface / matches_surface * 100.0) if matches_surface else 0.0
-                    label = SURFACE_LABELS.get(surface_code, surface_code)
-                    lines.append(
-                        f"- {label}: {wins_surface}W-{losses_surface}L ({rate_surface:.1f}%)"
-                    )
+                if filters_desc_full:
+                    lines.append("")
+                    lines.append("Filtri attivi: " + ", ".join(filters_desc_full))
 
-            sorted_tournaments = sorted(
-                tournament_stats.items(),
-                key=lambda item: (item[1]["wins"], item[1]["matches"]),
-                reverse=True,
-            )[:5]
-            if sorted_tournaments:
-                lines.append("")
-                lines.append(to_unicode_bold("Migliori tornei:"))
-                for t_name, data in sorted_tournaments:
-                    matches_t = data["matches"]
-                    wins_t = data["wins"]
-                    losses_t = matches_t - wins_t
-                    rate_t = (wins_t / matches_t * 100.0) if matches_t else 0.0
-                    lines.append(f"- {t_name}: {wins_t}W-{losses_t}L ({rate_t:.1f}%)")
-
-            if not year_filter and year_stats:
-                lines.append("")
-                lines.append(to_unicode_bold("Performance per anno:"))
-                for year, data in sorted(year_stats.items(), key=lambda item: item[0], reverse=True)[:5]:
-                    matches_y = data["matches"]
-                    wins_y = data["wins"]
-                    losses_y = matches_y - wins_y
-                    rate_y = (wins_y / matches_y * 100.0) if matches_y else 0.0
-                    lines.append(f"- {year}: {wins_y}W-{losses_y}L ({rate_y:.1f}%)")
-
-            if not (has_year or has_surface or has_tournament):
-                lines.append("")
-                lines.append("Consiglio: puoi filtrare per anno, superficie o torneo.")
-                lines.append("Esempi: 'nel 2024', 'su erba', 'a Wimbledon', 'su erba nel 2022'.")
-
-            if filters_desc_full:
-                lines.append("")
-                lines.append("Filtri attivi: " + ", ".join(filters_desc_full))
-
-            dispatcher.utter_message(text="\n".join(lines))
-
-            events: List[Any] = [SlotSet("player_name", canonical_name)]
-            events.extend(ctx.slot_events(clear_unset=True))
-            events.append(SlotSet("player1", None))
-            events.append(SlotSet("player2", None))
-            events.append(SlotSet(LAST_CONTEXT_SLOT, self.name()))
-            events.append(FollowupAction("action_listen"))
-            return events
-        except Exception as exc:
+                dispatcher.utter_message(text="\n".join(lines))
+
+                return [
+                    SlotSet("player_name", canonical_name),
+                    *ctx.slot_events(clear_unset=True),
+                    SlotSet("player1", None),
+                    SlotSet("player2", None),
+                    SlotSet(LAST_CONTEXT_SLOT, self.name()),
+                    FollowupAction("action_listen"),
+                ]
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel calcolare le statistiche: {exc}")
             return [FollowupAction("action_listen")]
-        finally:
-            if conn:
-                conn.close()
 
 
 class ActionHeadToHead(Action):
@@ -1385,8 +2045,7 @@ class ActionHeadToHead(Action):
     ) -> List[Dict[Text, Any]]:
         # Recupero giocatori e filtri contestuali per gestire anche messaggi di follow-up
         ctx = build_filter_context(tracker)
-        entities = ctx.entities
-        players = [e.get("value") for e in entities if e.get("entity") == "player"]
+        players = ctx.players
 
         # Per sicurezza usiamo sia gli slot del form sia le eventuali entita nell'ultimo messaggio
         p1_name = tracker.get_slot("player1")
@@ -1432,157 +2091,131 @@ class ActionHeadToHead(Action):
         has_surface = ctx.explicit_surface
         has_tournament = ctx.explicit_tournament
 
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            p1_id, p1_canonical = validate_and_find_player(p1_name, cur)
-            p2_id, p2_canonical = validate_and_find_player(p2_name, cur)
-            if not p1_id or not p2_id:
-                response = "Non ho trovato i giocatori richiesti.\n"
-                if not p1_id:
-                    sim1 = find_similar_names(p1_name, "players", "player_name", limit=3)
-                    if sim1:
-                        response += f"Possibili alternative per '{p1_name}': {', '.join(sim1)}.\n"
-                if not p2_id:
-                    sim2 = find_similar_names(p2_name, "players", "player_name", limit=3)
-                    if sim2:
-                        response += f"Possibili alternative per '{p2_name}': {', '.join(sim2)}."
-                dispatcher.utter_message(text=response.strip())
-                return [FollowupAction("action_listen")]
-
-            matches_query = (
-                "SELECT * FROM matches "
-                "WHERE ((winner_id = ? AND loser_id = ?) OR (winner_id = ? AND loser_id = ?))"
-            )
-            params: List[Any] = [p1_id, p2_id, p2_id, p1_id]
-            if year_filter:
-                matches_query += " AND tourney_date LIKE ?"
-                params.append(f"{year_filter}%")
-            if surface_filter:
-                matches_query += " AND surface = ?"
-                params.append(surface_filter)
-            if tournament_filter:
-                matches_query += " AND LOWER(tourney_name) LIKE LOWER(?)"
-                params.append(f"%{tournament_filter}%")
-            matches_query += " ORDER BY tourney_date DESC, match_id DESC"
-
-            cur.execute(matches_query, params)
-            raw_rows = cur.fetchall()
-
-            seen: set = set()
-            match_rows: List[Tuple[Any, ...]] = []
-            for row in raw_rows:
-                key = make_match_signature(row)
-                if key in seen:
-                    continue
-                seen.add(key)
-                match_rows.append(row)
-
-            filters_desc = ctx.describe()
-            total_matches = len(match_rows)
-            p1_id_str = str(p1_id)
-            p2_id_str = str(p2_id)
-
-            def build_events(clear_unset: bool = True) -> List[Any]:
-                events: List[Any] = [SlotSet("player1", p1_canonical), SlotSet("player2", p2_canonical)]
-                events.extend(ctx.slot_events(clear_unset=clear_unset))
-                events.append(SlotSet(LAST_CONTEXT_SLOT, self.name()))
-                events.append(FollowupAction("action_listen"))
-                return events
+            with pooled_cursor() as cur:
+                p1_id, p1_canonical = validate_and_find_player(p1_name, cur)
+                p2_id, p2_canonical = validate_and_find_player(p2_name, cur)
+                if not p1_id or not p2_id:
+                    response = "Non ho trovato i giocatori richiesti.\n"
+                    if not p1_id:
+                        sim1 = find_similar_names(p1_name, "players", "player_name", limit=3)
+                        if sim1:
+                            response += f"Possibili alternative per '{p1_name}': {', '.join(sim1)}.\n"
+                    if not p2_id:
+                        sim2 = find_similar_names(p2_name, "players", "player_name", limit=3)
+                        if sim2:
+                            response += f"Possibili alternative per '{p2_name}': {', '.join(sim2)}."
+                    dispatcher.utter_message(text=response.strip())
+                    return [FollowupAction("action_listen")]
+
+                # Conteggi per (superficie, anno) aggregati da SQLite sui match senza duplicati
+                mask, filter_params = match_filter_params(year_filter, surface_filter, tournament_filter)
+                match_params = [p1_id, p2_id, p2_id, p1_id] + filter_params
+                cur.execute(H2H_SUMMARY_QUERIES[mask], [p1_id] + match_params)
+                summary_rows = cur.fetchall()
+
+                filters_desc = ctx.describe()
+                total_matches = sum(row["matches"] for row in summary_rows)
+
+                def build_events(clear_unset: bool = True) -> List[Any]:
+                    return [
+                        SlotSet("player1", p1_canonical),
+                        SlotSet("player2", p2_canonical),
+                        *ctx.slot_events(clear_unset=clear_unset),
+                        SlotSet(LAST_CONTEXT_SLOT, self.name()),
+                        FollowupAction("action_listen"),
+                    ]
 
-            if total_matches == 0:
-                msg = f"Nessuna partita trovata tra {p1_canonical} e {p2_canonical}."
-                if filters_desc:
-                    msg += "\nFiltri usati: " + ", ".join(filters_desc)
-                dispatcher.utter_message(text=msg)
-                reset_events: List[Any] = [SlotSet("player1", p1_canonical), SlotSet("player2", p2_canonical)]
-                if has_year or year_filter or ctx.slot_year:
-                    reset_events.append(SlotSet("year", None))
-                if has_surface or surface_filter or ctx.slot_surface:
-                    reset_events.append(SlotSet("surface", None))
-                if has_tournament or tournament_filter or ctx.slot_tournament:
-                    reset_events.append(SlotSet("tournament_name", None))
-                reset_events.append(SlotSet(LAST_CONTEXT_SLOT, None))
-                reset_events.append(FollowupAction("action_listen"))
-                return reset_events
-
-            p1_wins = sum(1 for row in match_rows if str(row[7]) == p1_id_str)
-            p2_wins = total_matches - p1_wins
-
-            p1_rate = (p1_wins / total_matches * 100.0) if total_matches else 0.0
-            p2_rate = (p2_wins / total_matches * 100.0) if total_matches else 0.0
-
-            lines: List[str] = [
-                to_unicode_bold(f"Head-to-Head: {p1_canonical} vs {p2_canonical}"),
-                "",
-                to_unicode_bold("Partite totali") + f": {total_matches}",
-                to_unicode_bold(f"{p1_canonical}") + f": {p1_wins} vittorie ({p1_rate:.1f}%)",
-                to_unicode_bold(f"{p2_canonical}") + f": {p2_wins} vittorie ({p2_rate:.1f}%)",
-            ]
-
-            surface_stats: Dict[str, Dict[str, int]] = {}
-            year_stats: Dict[str, Dict[str, int]] = {}
-            for row in match_rows:
-                surface_code = (row[2] or "").strip() or "N/A"
-                surf_entry = surface_stats.setdefault(surface_code, {"matches": 0, "wins": 0})
-                surf_entry["matches"] += 1
-                if str(row[7]) == p1_id_str:
-                    surf_entry["wins"] += 1
-
-                if not year_filter:
-                    date_str = str(row[5] or "")
-                    year = date_str[:4] if len(date_str) >= 4 else ""
-                    if year.isdigit():
-                        year_entry = year_stats.setdefault(year, {"matches": 0, "wins": 0})
-                        year_entry["matches"] += 1
-                        if str(row[7]) == p1_id_str:
-                            year_entry["wins"] += 1
-
-            if surface_stats:
-                lines.append("")
-                lines.append(to_unicode_bold("Per superficie:"))
-                for surface_code, data in sorted(surface_stats.items(), key=lambda item: item[1]["matches"], reverse=True):
-                    matches = data["matches"]
-                    p1_surf_wins = data["wins"]
-                    p2_surf_wins = matches - p1_surf_wins
-                    p1_pct = (p1_surf_wins / matches * 100.0) if matches else 0.0
-                    p2_pct = (p2_surf_wins / matches * 100.0) if matches else 0.0
-                    label = SURFACE_LABELS.get(surface_code, surface_code or "N/A")
-                    lines.append(f"- {label}: {p1_canonical} {p1_surf_wins}W ({p1_pct:.1f}%) / {p2_canonical} {p2_surf_wins}W ({p2_pct:.1f}%)")
-
-            if not year_filter and year_stats:
-                lines.append("")
-                lines.append(to_unicode_bold("Per anno (ultimi 5):"))
-                for year, data in sorted(year_stats.items(), key=lambda item: item[0], reverse=True)[:5]:
-                    matches = data["matches"]
-                    p1_year_wins = data["wins"]
-                    p2_year_wins = matches - p1_year_wins
-                    lines.append(f"- {year}: {p1_canonical} {p1_year_wins}W / {p2_canonical} {p2_year_wins}W")
-
-            if match_rows:
-                lines.append("")
-                lines.append(to_unicode_bold("Ultimi incontri:"))
-                for row in match_rows[:5]:
-                    info = get_match_display_info(row, cur)
-                    lines.append(
-                        f"- {info['tournament']} ({info['year']}) - {info['winner']} bt {info['loser']} {info['score'] or 'N/A'}"
-                    )
+                if total_matches == 0:
+                    msg = f"Nessuna partita trovata tra {p1_canonical} e {p2_canonical}."
+                    if filters_desc:
+                        msg += "\nFiltri usati: " + ", ".join(filters_desc)
+                    dispatcher.utter_message(text=msg)
+                    reset_events: List[Any] = [SlotSet("player1", p1_canonical), SlotSet("player2", p2_canonical)]
+                    if has_year or year_filter or ctx.slot_year:
+                        reset_events.append(SlotSet("year", None))
+                    if has_surface or surface_filter or ctx.slot_surface:
+                        reset_events.append(SlotSet("surface", None))
+                    if has_tournament or tournament_filter or ctx.slot_tournament:
+                        reset_events.append(SlotSet("tournament_name", None))
+                    reset_events.extend((SlotSet(LAST_CONTEXT_SLOT, None), FollowupAction("action_listen")))
+                    return reset_events
+
+                p1_wins = sum(row["p1_wins"] for row in summary_rows)
+                p2_wins = total_matches - p1_wins
+
+                p1_rate = (p1_wins / total_matches * 100.0) if total_matches else 0.0
+                p2_rate = (p2_wins / total_matches * 100.0) if total_matches else 0.0
+
+                lines: List[str] = [
+                    to_unicode_bold(f"Head-to-Head: {p1_canonical} vs {p2_canonical}"),
+                    "",
+                    f"{BOLD_LABELS['Partite totali']}: {total_matches}",
+                    to_unicode_bold(f"{p1_canonical}") + f": {p1_wins} vittorie ({p1_rate:.1f}%)",
+                    to_unicode_bold(f"{p2_canonical}") + f": {p2_wins} vittorie ({p2_rate:.1f}%)",
+                ]
 
-            if filters_desc:
-                lines.append("")
-                lines.append("Filtri attivi: " + ", ".join(filters_desc))
+                surface_stats: Dict[str, Dict[str, int]] = {}
+                year_stats: Dict[str, Dict[str, int]] = {}
+                for row in summary_rows:
+                    surface_code = (row["surface"] or "").strip() or "N/A"
+                    surf_entry = surface_stats.setdefault(surface_code, {"matches": 0, "wins": 0})
+                    surf_entry["matches"] += row["matches"]
+                    surf_entry["wins"] += row["p1_wins"]
+
+                    if not year_filter:
+                        year = row["year"] or ""
+                        if len(year) == 4 and year.isdigit():
+                            year_entry = year_stats.setdefault(year, {"matches": 0, "wins": 0})
+                            year_entry["matches"] += row["matches"]
+                            year_entry["wins"] += row["p1_wins"]
+
+                if surface_stats:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Per superficie:"])
+                    for surface_code, data in sorted(surface_stats.items(), key=lambda item: item[1]["matches"], reverse=True):
+                        matches = data["matches"]
+                        p1_surf_wins = data["wins"]
+                        p2_surf_wins = matches - p1_surf_wins
+                        p1_pct = (p1_surf_wins / matches * 100.0) if matches else 0.0
+                        p2_pct = (p2_surf_wins / matches * 100.0) if matches else 0.0
+                        label = SURFACE_LABELS.get(surface_code, surface_code or "N/A")
+                        lines.append(
+                            f"- {label}: {p1_canonical} {p1_surf_wins}W ({p1_pct:.1f}%) / "
+                            f"{p2_canonical} {p2_surf_wins}W ({p2_pct:.1f}%)"
+                        )
+
+                if not year_filter and year_stats:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Per anno (ultimi 5):"])
+                    for year, data in heapq.nlargest(5, year_stats.items(), key=lambda item: item[0]):
+                        matches = data["matches"]
+                        p1_year_wins = data["wins"]
+                        p2_year_wins = matches - p1_year_wins
+                        lines.append(f"- {year}: {p1_canonical} {p1_year_wins}W / {p2_canonical} {p2_year_wins}W")
+
+                cur.execute(H2H_RECENT_QUERIES[mask], match_params)
+                recent_rows = cur.fetchall()
+                if recent_rows:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Ultimi incontri:"])
+                    names = get_match_player_names(recent_rows, cur)
+                    for row in recent_rows:
+                        info = get_match_display_info(row, names)
+                        lines.append(
+                            f"- {info['tournament']} ({info['year']}) - {info['winner']} bt {info['loser']} {info['score'] or 'N/A'}"
+                        )
+
+                if filters_desc:
+                    lines.append("")
+                    lines.append("Filtri attivi: " + ", ".join(filters_desc))
 
-            dispatcher.utter_message(text="\n".join(lines))
+                dispatcher.utter_message(text="\n".join(lines))
 
-            return build_events(clear_unset=True)
-        except Exception as exc:
+                return build_events(clear_unset=True)
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel calcolare l'H2H: {exc}")
             return [FollowupAction("action_listen")]
-        finally:
-            if conn:
-                conn.close()
 
 
 class ActionTournamentInfo(Action):
@@ -1604,120 +2237,85 @@ class ActionTournamentInfo(Action):
             dispatcher.utter_message(response="utter_ask_tournament_name")
             return []
 
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            base_query = (
-                "SELECT tourney_name, surface, COUNT(*) AS match_count, "
-                "MIN(tourney_date) AS first_date, MAX(tourney_date) AS last_date "
-                "FROM matches WHERE LOWER(tourney_name) LIKE LOWER(?) "
-                "GROUP BY tourney_name, surface "
-                "ORDER BY match_count DESC "
-                "LIMIT 1"
-            )
-            cur.execute(base_query, (f"%{tournament_name}%",))
-            row = cur.fetchone()
-
-            if not row:
-                suggestions = find_similar_names(tournament_name, "matches", "tourney_name", limit=5)
-                if suggestions:
-                    buttons = [
-                        {
-                            "title": suggestion,
-                            "payload": make_intent_payload("tournament_info", {"tournament": suggestion}),
-                        }
-                        for suggestion in suggestions
-                    ]
-                    dispatcher.utter_message(
-                        text=f"Torneo '{tournament_name}' non trovato. Forse cercavi:",
-                        buttons=buttons,
-                    )
-                else:
-                    message = f"Torneo '{tournament_name}' non trovato."
-                    dispatcher.utter_message(text=message)
-                return []
-            tourney_name, surface, match_count, first_date, last_date = row
-            surface_label = SURFACE_LABELS.get(surface, surface or "N/A")
-            lines: List[str] = [
-                to_unicode_bold(f"Informazioni torneo: {tourney_name}"),
-                "",
-                f"Superficie principale: {surface_label}",
-                f"Numero partite registrate: {match_count}",
-            ]
-            if first_date:
-                lines.append(f"Prima edizione presente nel database: {format_tournament_date(first_date)}")
-            if last_date:
-                lines.append(f"Ultima edizione presente nel database: {format_tournament_date(last_date)}")
-            champion_row: Optional[Tuple[Any, ...]] = None
-            if last_date:
-                cur.execute(
-                    """
-                    SELECT *
-                    FROM matches
-                    WHERE LOWER(tourney_name) = LOWER(?)
-                      AND tourney_date = ?
-                      AND UPPER(round) IN ('F', 'FIN', 'FINAL')
-                    ORDER BY match_id DESC
-                    LIMIT 1
-                    """,
-                    (tourney_name, last_date),
-                )
-                champion_row = cur.fetchone()
-            if not champion_row:
-                cur.execute(
-                    """
-                    SELECT *
-                    FROM matches
-                    WHERE LOWER(tourney_name) = LOWER(?)
-                      AND UPPER(round) IN ('F', 'FIN', 'FINAL')
-                    ORDER BY tourney_date DESC, match_id DESC
-                    LIMIT 1
-                    """,
-                    (tourney_name,),
-                )
-                champion_row = cur.fetchone()
-            if champion_row:
-                champ_info = get_match_display_info(champion_row, cur)
-                lines.append("")
-                lines.append(
-                    to_unicode_bold("Ultimo campione")
-                    + f": {champ_info['winner']} ({champ_info['year']})"
-                )
-                lines.append(
-                    f"Finale: {champ_info['winner']} bt {champ_info['loser']} {champ_info['score'] or 'N/A'}"
+            # Tutte le letture in un'unica transazione sulla connessione del pool
+            with pooled_cursor() as cur:
+                row = None
+                for pattern in tournament_like_patterns(tournament_name):
+                    cur.execute(TOURNAMENT_SUMMARY_SQL, (pattern,))
+                    row = cur.fetchone()
+                    if row:
+                        break
+
+                if not row:
+                    suggestions = find_similar_names(tournament_name, "matches", "tourney_name", limit=5)
+                    if suggestions:
+                        buttons = [
+                            {
+                                "title": suggestion,
+                                "payload": make_intent_payload("tournament_info", {"tournament": suggestion}),
+                            }
+                            for suggestion in suggestions
+                        ]
+                        dispatcher.utter_message(
+                            text=f"Torneo '{tournament_name}' non trovato. Forse cercavi:",
+                            buttons=buttons,
+                        )
+                    else:
+                        message = f"Torneo '{tournament_name}' non trovato."
+                        dispatcher.utter_message(text=message)
+                    return []
+                tourney_name, surface, match_count, first_date, last_date = row
+                surface_label = SURFACE_LABELS.get(surface, surface or "N/A")
+                lines: List[str] = [
+                    to_unicode_bold(f"Informazioni torneo: {tourney_name}"),
+                    "",
+                    f"Superficie principale: {surface_label}",
+                    f"Numero partite registrate: {match_count}",
+                ]
+                if first_date:
+                    lines.append(f"Prima edizione presente nel database: {format_tournament_date(first_date)}")
+                if last_date:
+                    lines.append(f"Ultima edizione presente nel database: {format_tournament_date(last_date)}")
+                cur.execute(TOURNAMENT_CHAMPION_SQL, (tourney_name, last_date))
+                champion_row: Optional[sqlite3.Row] = cur.fetchone()
+                cur.execute(TOURNAMENT_RECENT_SQL, (f"%{tourney_name}%",))
+                recent_matches = cur.fetchall()
+                # Nomi di finale e ultime partite risolti insieme, con una sola query
+                names = get_match_player_names(
+                    [champion_row, *recent_matches] if champion_row else recent_matches, cur
                 )
-            recent_query = (
-                "SELECT * FROM matches "
-                "WHERE LOWER(tourney_name) LIKE LOWER(?) "
-                "ORDER BY tourney_date DESC, match_id DESC LIMIT 5"
-            )
-            cur.execute(recent_query, (f"%{tourney_name}%",))
-            recent_matches = cur.fetchall()
-            if recent_matches:
-                lines.append("")
-                lines.append(to_unicode_bold("Ultime partite registrate:"))
-                for match_row in recent_matches:
-                    info = get_match_display_info(match_row, cur)
-                    lines.append(f"- {info['tournament']} ({info['year']}) - {info['winner']} bt {info['loser']} {info['score'] or 'N/A'}")
-            dispatcher.utter_message(text="\n".join(lines))
-            events: List[Dict[Text, Any]] = [SlotSet("tournament_name", tourney_name)]
-            events.extend(ctx.slot_events(clear_unset=False))
-            return events
-        except Exception as exc:
+                if champion_row:
+                    champ_info = get_match_display_info(champion_row, names)
+                    lines.append("")
+                    lines.append(
+                        BOLD_LABELS["Ultimo campione"]
+                        + f": {champ_info['winner']} ({champ_info['year']})"
+                    )
+                    lines.append(
+                        f"Finale: {champ_info['winner']} bt {champ_info['loser']} {champ_info['score'] or 'N/A'}"
+                    )
+                if recent_matches:
+                    lines.append("")
+                    lines.append(BOLD_LABELS["Ultime partite registrate:"])
+                    lines.extend(
+                        f"- {info['tournament']} ({info['year']}) - {info['winner']} bt {info['loser']} {info['score'] or 'N/A'}"
+                        for info in (get_match_display_info(match_row, names) for match_row in recent_matches)
+                    )
+                dispatcher.utter_message(text="\n".join(lines))
+                events: List[Dict[Text, Any]] = [SlotSet("tournament_name", tourney_name)]
+                events.extend(ctx.slot_events(clear_unset=False))
+                return events
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel recuperare info torneo: {exc}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
 
 class ActionMatchResult(Action):
     """Gestisce tutte le richieste sui risultati dei match (1 player, 2 player, torneo, anno)."""
 
     # Liste di parole da ignorare quando si estraggono i nomi dai messaggi liberi.
-    _PREFIX_FILLERS = {
+    _PREFIX_FILLERS = frozenset({
         "il",
         "lo",
         "la",
@@ -1747,11 +2345,13 @@ class ActionMatchResult(Action):
         "ultime",
         "ultimo",
         "ultima",
-    }
+    })
     # Parole di chiusura da scartare quando compattiamo i frammenti.
-    _SUFFIX_FILLERS = {"match", "partita", "partite", "vs", "contro"}
+    _SUFFIX_FILLERS = frozenset({"match", "partita", "partite", "vs", "contro"})
+    # Separatori tra i due giocatori, scartati durante la tokenizzazione.
+    _VS_TOKENS = frozenset({"vs", "vs.", "versus", "contro"})
     # Token che interrompono la cattura del nome quando incontrati.
-    _BREAK_TOKENS = {
+    _BREAK_TOKENS = frozenset({
         "a",
         "ad",
         "al",
@@ -1786,7 +2386,11 @@ class ActionMatchResult(Action):
         "dai",
         "dagli",
         "dalle",
-    }
+    })
+
+    # Cache dei frammenti ripuliti e degli alias: i nomi ritornano spesso fra un turno e l'altro.
+    _fragment_cache: Dict[Tuple[str, bool], str] = {}
+    _alias_cache: Dict[str, Tuple[str, ...]] = {}
 
     def name(self) -> Text:
         return "action_match_result"
@@ -1794,12 +2398,12 @@ class ActionMatchResult(Action):
     @classmethod
     def _tokenize(cls, text: str) -> List[str]:
         """Riduce il testo ad una lista di token utili al riconoscimento dei nomi."""
-        cleaned = re.sub(r"[^A-Za-zÀ-ÖØ-öø-ÿ' -]", " ", str(text))
+        cleaned = _NAME_CLEAN_RE.sub(" ", str(text))
         tokens = [tok for tok in cleaned.split() if tok]
         result: List[str] = []
         for tok in tokens:
             lower = tok.lower()
-            if lower in {"vs", "vs.", "versus", "contro"}:
+            if lower in cls._VS_TOKENS:
                 continue
             if tok.isdigit():
                 continue
@@ -1809,9 +2413,26 @@ class ActionMatchResult(Action):
         return result
 
     @classmethod
-    def _clean_player_fragment(cls, fragment: str, from_end: bool) -> str:
-        """Ripulisce un frammento di frase cercando il nome più probabile."""
-        tokens = cls._tokenize(fragment)
+    def _clean_player_fragment(
+        cls, fragment: str, from_end: bool, tokens: Optional[List[str]] = None
+    ) -> str:
+        """Ripulisce un frammento di frase cercando il nome più probabile (con cache).
+
+        `tokens`, se passato, è il risultato di `_tokenize(fragment)` già calcolato dal chiamante.
+        """
+        key = (fragment, from_end)
+        cleaned = cls._fragment_cache.get(key)
+        if cleaned is None:
+            cleaned = cls._extract_fragment_name(fragment, from_end, tokens)
+            _cache_store(cls._fragment_cache, key, cleaned)
+        return cleaned
+
+    @classmethod
+    def _extract_fragment_name(
+        cls, fragment: str, from_end: bool, tokens: Optional[List[str]] = None
+    ) -> str:
+        """Calcolo effettivo di `_clean_player_fragment` (lavora su una copia dei token)."""
+        tokens = list(tokens) if tokens is not None else cls._tokenize(fragment)
         if not tokens:
             return ""
 
@@ -1848,8 +2469,17 @@ class ActionMatchResult(Action):
         return " ".join(collected)
 
     @classmethod
-    def _candidate_aliases(cls, raw: str) -> List[str]:
-        """Genera diverse varianti del nome per massimizzare il match nel DB."""
+    def _candidate_aliases(cls, raw: str) -> Tuple[str, ...]:
+        """Genera diverse varianti del nome per massimizzare il match nel DB (con cache)."""
+        aliases = cls._alias_cache.get(raw)
+        if aliases is None:
+            aliases = cls._build_candidate_aliases(raw)
+            _cache_store(cls._alias_cache, raw, aliases)
+        return aliases
+
+    @classmethod
+    def _build_candidate_aliases(cls, raw: str) -> Tuple[str, ...]:
+        """Calcolo effettivo di `_candidate_aliases`."""
         aliases: List[str] = []
         seen: set = set()
 
@@ -1859,24 +2489,25 @@ class ActionMatchResult(Action):
             candidate = alias.strip()
             if len(candidate) < 2:
                 return
-            key = candidate.lower()
+            key = normalize_player_alias(candidate)
             if key in seen:
                 return
             seen.add(key)
             aliases.append(candidate)
 
+        # Tokenizzazione unica, condivisa con le due ripuliture del frammento
+        tokens = cls._tokenize(raw)
         add(str(raw or "").strip())
-        add(cls._clean_player_fragment(raw, from_end=True))
-        add(cls._clean_player_fragment(raw, from_end=False))
+        add(cls._clean_player_fragment(raw, from_end=True, tokens=tokens))
+        add(cls._clean_player_fragment(raw, from_end=False, tokens=tokens))
 
-        tokens = cls._tokenize(raw)
         if tokens:
             if len(tokens) >= 2:
                 add(" ".join(tokens[-2:]))
                 add(" ".join(tokens[:2]))
             add(tokens[-1])
             add(tokens[0])
-        return aliases
+        return tuple(aliases)
 
     def run(
         self,
@@ -1885,14 +2516,14 @@ class ActionMatchResult(Action):
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
         ctx = build_filter_context(tracker)
-        entities = ctx.entities
 
-        player_entities = [str(e.get("value")).strip() for e in entities if e.get("entity") == "player" and e.get("value")]
+        player_entities = [str(value).strip() for value in ctx.players if value]
 
         year_filter = ctx.year or tracker.get_slot("year")
         surface_filter = ctx.surface or tracker.get_slot("surface")
         if surface_filter and surface_filter not in VALID_SURFACE_CODES:
-            surface_filter = None
+            # Slot con un sinonimo ("erba", "clay"): un solo tentativo di normalizzazione
+            surface_filter = normalize_surface_value(surface_filter)
 
         slot_player1 = tracker.get_slot("player1")
         slot_player2 = tracker.get_slot("player2")
@@ -1900,7 +2531,7 @@ class ActionMatchResult(Action):
         slot_tournament = tracker.get_slot("tournament_name")
 
         players: List[str] = []
-        players_lower: set = set()
+        player_keys: set = set()
 
         def add_player(value: Optional[str]) -> None:
             if not value:
@@ -1908,10 +2539,10 @@ class ActionMatchResult(Action):
             candidate = str(value).strip()
             if not candidate:
                 return
-            key = candidate.lower()
-            if key in players_lower:
+            key = normalize_player_alias(candidate)
+            if key in player_keys:
                 return
-            players_lower.add(key)
+            player_keys.add(key)
             players.append(candidate)
 
         for player in player_entities:
@@ -1929,43 +2560,37 @@ class ActionMatchResult(Action):
         tournament_filter = ctx.message_tournament
         if not tournament_filter and len(players) < 2:
             tournament_filter = slot_tournament
-        if tournament_filter and tournament_filter.lower() in players_lower:
+        if tournament_filter and normalize_player_alias(tournament_filter) in player_keys:
             tournament_filter = None
 
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-
-            if len(players) >= 2:
-                return self._handle_pair(
-                    dispatcher,
-                    cur,
-                    players,
-                    ctx,
-                    year_filter,
-                    surface_filter,
-                    tournament_filter,
-                )
-            if len(players) == 1:
-                return self._handle_single(
-                    dispatcher,
-                    cur,
-                    players[0],
-                    ctx,
-                    year_filter,
-                    surface_filter,
-                    tournament_filter,
-                )
-            if tournament_filter:
-                return self._handle_tournament(dispatcher, cur, ctx, tournament_filter, year_filter, surface_filter)
-            return self._handle_latest(dispatcher, cur, ctx, year_filter, surface_filter)
-        except Exception as exc:
+            with pooled_cursor() as cur:
+                if len(players) >= 2:
+                    return self._handle_pair(
+                        dispatcher,
+                        cur,
+                        players,
+                        ctx,
+                        year_filter,
+                        surface_filter,
+                        tournament_filter,
+                    )
+                if len(players) == 1:
+                    return self._handle_single(
+                        dispatcher,
+                        cur,
+                        players[0],
+                        ctx,
+                        year_filter,
+                        surface_filter,
+                        tournament_filter,
+                    )
+                if tournament_filter:
+                    return self._handle_tournament(dispatcher, cur, ctx, tournament_filter, year_filter, surface_filter)
+                return self._handle_latest(dispatcher, cur, ctx, year_filter, surface_filter)
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel recuperare i risultati dei match: {exc}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
     def _handle_pair(
         self,
@@ -1981,6 +2606,13 @@ class ActionMatchResult(Action):
         local_tournament = tournament_filter
         seen_aliases: set = set()
 
+        # Un'unica query sugli alias di tutti i candidati: le risoluzioni del ciclo
+        # successivo trovano già in cache i nomi presenti in player_aliases.
+        prefetch_player_aliases(
+            (alias for candidate in player_candidates if candidate for alias in self._candidate_aliases(candidate)),
+            cursor,
+        )
+
         for candidate in player_candidates:
             if len(resolved_players) >= 2:
                 break
@@ -1988,7 +2620,7 @@ class ActionMatchResult(Action):
                 continue
             candidate_found = False
             for alias in self._candidate_aliases(candidate):
-                alias_key = alias.lower()
+                alias_key = normalize_player_alias(alias)
                 if alias_key in seen_aliases:
                     continue
                 seen_aliases.add(alias_key)
@@ -2018,7 +2650,7 @@ class ActionMatchResult(Action):
                 if len(resolved_players) >= 2:
                     break
                 for alias in self._candidate_aliases(name):
-                    alias_key = alias.lower()
+                    alias_key = normalize_player_alias(alias)
                     if alias_key in seen_aliases:
                         continue
                     seen_aliases.add(alias_key)
@@ -2034,23 +2666,9 @@ class ActionMatchResult(Action):
         (p1_id, p1_canonical), (p2_id, p2_canonical) = resolved_players
         tournament_filter = local_tournament
 
-        query = (
-            "SELECT * FROM matches "
-            "WHERE ((winner_id = ? AND loser_id = ?) OR (winner_id = ? AND loser_id = ?))"
-        )
-        params: List[Any] = [p1_id, p2_id, p2_id, p1_id]
-        if year_filter:
-            query += " AND tourney_date LIKE ?"
-            params.append(f"{year_filter}%")
-        if surface_filter:
-            query += " AND surface = ?"
-            params.append(surface_filter)
-        if tournament_filter:
-            query += " AND LOWER(tourney_name) LIKE LOWER(?)"
-            params.append(f"%{tournament_filter}%")
-        query += " ORDER BY tourney_date DESC, match_id DESC LIMIT 10"
-
-        match_rows = fetch_unique_match_dicts(cursor, query, params)  # ordina gia' per data decrescente
+        mask, filter_params = match_filter_params(year_filter, surface_filter, tournament_filter)
+        cursor.execute(H2H_DETAIL_QUERIES[mask], [p1_id, p2_id, p2_id, p1_id] + filter_params)
+        match_rows = cursor.fetchall()  # ordina gia' per data decrescente
         filters_desc = describe_filters(year_filter, surface_filter, tournament_filter)
 
         if not match_rows:
@@ -2058,55 +2676,46 @@ class ActionMatchResult(Action):
             if filters_desc:
                 message += "\nFiltri usati: " + ", ".join(filters_desc)
             dispatcher.utter_message(text=message)
-            events = [
-                SlotSet("player_name", None),
-                SlotSet("player1", p1_canonical),
-                SlotSet("player2", p2_canonical),
-                SlotSet("year", year_filter if year_filter else None),
-                SlotSet("surface", surface_filter if surface_filter else None),
-                SlotSet("tournament_name", tournament_filter if tournament_filter else None),
-                SlotSet(LAST_CONTEXT_SLOT, None),
-            ]
-            events.append(FollowupAction("action_listen"))
-            return events
+            return result_slot_events(
+                player1=p1_canonical,
+                player2=p2_canonical,
+                tournament=tournament_filter,
+                year=year_filter,
+                surface=surface_filter,
+            )
 
         selected = match_rows[0]  # prendiamo il match piu' recente rispetto ai filtri
-        detail_lines = format_match_details(selected, cursor)
+        names = get_match_player_names(match_rows, cursor)  # dettaglio + altri 3 match
+        detail_lines = format_match_details(selected, names)
 
         if len(match_rows) > 1:
             detail_lines.append("")
-            detail_lines.append(to_unicode_bold("Altri match trovati:"))
-            for extra in match_rows[1:4]:
-                extra_raw = extra.get("__raw__")
-                extra_info = get_match_display_info(extra_raw, cursor) if extra_raw else {}
-                detail_lines.append(
-                    f"- {extra_info.get('tournament', 'N/A')} ({extra_info.get('year', 'N/A')}) - "
-                    f"{extra_info.get('winner', 'N/A')} bt {extra_info.get('loser', 'N/A')} "
-                    f"{extra_info.get('score') or 'N/A'} ({extra_info.get('round') or 'N/A'})"
-                )
+            detail_lines.append(BOLD_LABELS["Altri match trovati:"])
+            detail_lines.extend(
+                f"- {extra_info.get('tournament', 'N/A')} ({extra_info.get('year', 'N/A')}) - "
+                f"{extra_info.get('winner', 'N/A')} bt {extra_info.get('loser', 'N/A')} "
+                f"{extra_info.get('score') or 'N/A'} ({extra_info.get('round') or 'N/A'})"
+                for extra_info in (get_match_display_info(extra, names) for extra in match_rows[1:])
+            )
         detail_lines.append("")
-        detail_lines.append(f"Match disponibili nel database: {len(match_rows)}")
+        detail_lines.append(f"Match disponibili nel database: {selected['match_total']}")
         if filters_desc:
             detail_lines.append("Filtri attivi: " + ", ".join(filters_desc))
 
         dispatcher.utter_message(text="\n".join(detail_lines))
-        events: List[Any] = [
-            SlotSet("player_name", None),
-            SlotSet("player1", p1_canonical),
-            SlotSet("player2", p2_canonical),
-            SlotSet("year", year_filter if year_filter else None),
-            SlotSet("surface", surface_filter if surface_filter else None),
-            SlotSet("tournament_name", tournament_filter if tournament_filter else None),
-            SlotSet(LAST_CONTEXT_SLOT, self.name()),
-        ]
-        events.append(FollowupAction("action_listen"))
-        return events
+        return result_slot_events(
+            self.name(), player1=p1_canonical,
+            player2=p2_canonical,
+            tournament=tournament_filter,
+            year=year_filter,
+            surface=surface_filter,
+        )
 
     def _extract_players_from_text(self, text: Optional[str]) -> List[str]:
         """Tenta di ricavare due nomi dal pattern 'X vs Y' quando le entità non arrivano."""
         if not text:
             return []
-        match = re.search(r"(?i)(.+?)\s+(?:vs\.?|versus|contro)\s+(.+)", text)
+        match = _VS_SPLIT_RE.search(text)
         if not match:
             return []
         left = self._clean_player_fragment(match.group(1), from_end=True)
@@ -2114,7 +2723,9 @@ class ActionMatchResult(Action):
         results: List[str] = []
         for candidate in (left, right):
             cleaned = candidate.strip(" ,.-")
-            if cleaned and all(cleaned.lower() != existing.lower() for existing in results):
+            if cleaned and all(
+                normalize_player_alias(cleaned) != normalize_player_alias(existing) for existing in results
+            ):
                 results.append(cleaned)
         return results
 
@@ -2144,20 +2755,8 @@ class ActionMatchResult(Action):
             cursor, ctx.text, [canonical_name]
         )
 
-        query = "SELECT * FROM matches WHERE winner_id = ? OR loser_id = ?"
-        params: List[Any] = [player_id, player_id]
-        if year_filter:
-            query += " AND tourney_date LIKE ?"
-            params.append(f"{year_filter}%")
-        if surface_filter:
-            query += " AND surface = ?"
-            params.append(surface_filter)
-        if tournament_filter:
-            query += " AND LOWER(tourney_name) LIKE LOWER(?)"
-            params.append(f"%{tournament_filter}%")
-        query += " ORDER BY tourney_date DESC, match_id DESC LIMIT 5"
-
-        cursor.execute(query, params)
+        mask, filter_params = match_filter_params(year_filter, surface_filter, tournament_filter)
+        cursor.execute(PLAYER_LATEST_QUERIES[mask], [player_id, player_id] + filter_params)
         rows = cursor.fetchall()
 
         filters_desc = describe_filters(year_filter, surface_filter, tournament_filter)
@@ -2166,44 +2765,39 @@ class ActionMatchResult(Action):
             if filters_desc:
                 message += "\nFiltri usati: " + ", ".join(filters_desc)
             dispatcher.utter_message(text=message)
-            events = [
-                SlotSet("player_name", canonical_name),
-                SlotSet("player1", canonical_name),
-                SlotSet("player2", None),
-                SlotSet("year", year_filter if year_filter else None),
-                SlotSet("surface", surface_filter if surface_filter else None),
-                SlotSet("tournament_name", tournament_filter if tournament_filter else None),
-                SlotSet(LAST_CONTEXT_SLOT, None),
-            ]
-            events.append(FollowupAction("action_listen"))
-            return events
-
-        lines: List[str] = [to_unicode_bold(f"Ultimi match di {canonical_name}")]
-        if filters_desc:
-            lines.append("Filtri attivi: " + ", ".join(filters_desc))
-        lines.append("")
-        for row in rows:
-            info = get_match_display_info(row, cursor)
-            result = "W" if str(info.get("winner_id")) == str(player_id) else "L"
-            opponent = info.get("loser") if result == "W" else info.get("winner")
-            lines.append(
-                f"- {info.get('tournament', 'N/A')} ({info.get('year', 'N/A')}) - "
-                f"{result} vs {opponent or 'N/A'} - {info.get('score') or 'N/A'} "
-                f"({info.get('round') or 'N/A'})"
+            return result_slot_events(
+                player_name=canonical_name,
+                player1=canonical_name,
+                tournament=tournament_filter,
+                year=year_filter,
+                surface=surface_filter,
             )
 
-        dispatcher.utter_message(text="\n".join(lines))
-        events = [
-            SlotSet("player_name", canonical_name),
-            SlotSet("player1", canonical_name),
-            SlotSet("player2", None),
-            SlotSet("year", year_filter if year_filter else None),
-            SlotSet("surface", surface_filter if surface_filter else None),
-            SlotSet("tournament_name", tournament_filter if tournament_filter else None),
-            SlotSet(LAST_CONTEXT_SLOT, self.name()),
+        names = joined_player_names(rows)
+        infos = [get_match_display_info(row, names) for row in rows]
+        lines: List[str] = [
+            to_unicode_bold(f"Ultimi match di {canonical_name}"),
+            *filter_header_lines(filters_desc),
+            "",
+            *[
+                f"- {info.get('tournament', 'N/A')} ({info.get('year', 'N/A')}) - "
+                + (
+                    f"W vs {info.get('loser') or 'N/A'}"
+                    if info.get("winner_id") == player_id
+                    else f"L vs {info.get('winner') or 'N/A'}"
+                )
+                + f" - {info.get('score') or 'N/A'} ({info.get('round') or 'N/A'})"
+                for info in infos
+            ],
         ]
-        events.append(FollowupAction("action_listen"))
-        return events
+        dispatcher.utter_message(text="\n".join(lines))
+        return result_slot_events(
+            self.name(), player_name=canonical_name,
+            player1=canonical_name,
+            tournament=tournament_filter,
+            year=year_filter,
+            surface=surface_filter,
+        )
 
     def _handle_tournament(
         self,
@@ -2214,29 +2808,14 @@ class ActionMatchResult(Action):
         year_filter: Optional[str],
         surface_filter: Optional[str],
     ) -> List[Dict[Text, Any]]:
-        exclude_players = [
-            str(e.get("value")).strip()
-            for e in ctx.entities
-            if e.get("entity") == "player" and e.get("value")
-        ]
+        exclude_players = [str(value).strip() for value in ctx.players if value]
         lookup_name = find_best_tournament(cursor, tournament_name)
         if not lookup_name:
             lookup_name = guess_tournament_from_text(cursor, ctx.text, exclude_players)
         search_name = lookup_name or tournament_name
 
-        cursor.execute(
-            """
-            SELECT tourney_name
-            FROM matches
-            WHERE LOWER(tourney_name) LIKE LOWER(?)
-            GROUP BY tourney_name
-            ORDER BY COUNT(*) DESC
-            LIMIT 1
-            """,
-            (f"%{search_name}%",),
-        )
-        row = cursor.fetchone()
-        if not row:
+        canonical_tourney = find_canonical_tournament(cursor, search_name)
+        if not canonical_tourney:
             message = f"Torneo '{tournament_name}' non trovato."
             suggestions = find_similar_names(tournament_name, "matches", "tourney_name", limit=5)
             if suggestions:
@@ -2244,19 +2823,8 @@ class ActionMatchResult(Action):
             dispatcher.utter_message(text=message)
             return []
 
-        canonical_tourney = row[0]
-
-        query = "SELECT * FROM matches WHERE tourney_name = ?"
-        params: List[Any] = [canonical_tourney]
-        if year_filter:
-            query += " AND tourney_date LIKE ?"
-            params.append(f"{year_filter}%")
-        if surface_filter:
-            query += " AND surface = ?"
-            params.append(surface_filter)
-        query += " ORDER BY tourney_date DESC, match_id DESC LIMIT 5"
-
-        cursor.execute(query, params)
+        mask, filter_params = match_filter_params(year_filter, surface_filter, None)
+        cursor.execute(TOURNAMENT_LATEST_QUERIES[mask], [canonical_tourney] + filter_params)
         rows = cursor.fetchall()
 
         filters_desc = describe_filters(year_filter, surface_filter, canonical_tourney)
@@ -2265,41 +2833,21 @@ class ActionMatchResult(Action):
             if filters_desc:
                 message += "\nFiltri usati: " + ", ".join(filters_desc)
             dispatcher.utter_message(text=message)
-            events = [
-                SlotSet("player_name", None),
-                SlotSet("player1", None),
-                SlotSet("player2", None),
-                SlotSet("tournament_name", canonical_tourney),
-                SlotSet("year", year_filter if year_filter else None),
-                SlotSet("surface", surface_filter if surface_filter else None),
-                SlotSet(LAST_CONTEXT_SLOT, None),
-            ]
-            events.append(FollowupAction("action_listen"))
-            return events
-
-        lines: List[str] = [to_unicode_bold(f"Ultimi match di {canonical_tourney}")]
-        if filters_desc:
-            lines.append("Filtri attivi: " + ", ".join(filters_desc))
-        lines.append("")
-        for record in rows:
-            info = get_match_display_info(record, cursor)
-            lines.append(
+            return result_slot_events(tournament=canonical_tourney, year=year_filter, surface=surface_filter)
+
+        names = joined_player_names(rows)
+        lines: List[str] = [
+            to_unicode_bold(f"Ultimi match di {canonical_tourney}"),
+            *filter_header_lines(filters_desc),
+            "",
+            *[
                 f"- {info.get('year', 'N/A')} - {info.get('winner', 'N/A')} bt "
                 f"{info.get('loser', 'N/A')} {info.get('score') or 'N/A'} ({info.get('round') or 'N/A'})"
-            )
-
-        dispatcher.utter_message(text="\n".join(lines))
-        events = [
-            SlotSet("player_name", None),
-            SlotSet("player1", None),
-            SlotSet("player2", None),
-            SlotSet("tournament_name", canonical_tourney),
-            SlotSet("year", year_filter if year_filter else None),
-            SlotSet("surface", surface_filter if surface_filter else None),
-            SlotSet(LAST_CONTEXT_SLOT, self.name()),
+                for info in [get_match_display_info(record, names) for record in rows]
+            ],
         ]
-        events.append(FollowupAction("action_listen"))
-        return events
+        dispatcher.utter_message(text="\n".join(lines))
+        return result_slot_events(self.name(), tournament=canonical_tourney, year=year_filter, surface=surface_filter)
 
     def _handle_latest(
         self,
@@ -2309,62 +2857,30 @@ class ActionMatchResult(Action):
         year_filter: Optional[str],
         surface_filter: Optional[str],
     ) -> List[Dict[Text, Any]]:
-        query = "SELECT * FROM matches"
-        conditions: List[str] = []
-        params: List[Any] = []
-        if year_filter:
-            conditions.append("tourney_date LIKE ?")
-            params.append(f"{year_filter}%")
-        if surface_filter:
-            conditions.append("surface = ?")
-            params.append(surface_filter)
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        query += " ORDER BY tourney_date DESC, match_id DESC LIMIT 5"
-
-        cursor.execute(query, params)
+        mask, filter_params = match_filter_params(year_filter, surface_filter, None)
+        cursor.execute(LATEST_MATCHES_QUERIES[mask], filter_params)
         rows = cursor.fetchall()
 
         filters_desc = describe_filters(year_filter, surface_filter, None)
         if not rows:
             message = "Non ho trovato match nel database con i filtri richiesti."
             dispatcher.utter_message(text=message)
-            events = [
-                SlotSet("player_name", None),
-                SlotSet("player1", None),
-                SlotSet("player2", None),
-                SlotSet("tournament_name", None),
-                SlotSet("year", year_filter if year_filter else None),
-                SlotSet("surface", surface_filter if surface_filter else None),
-                SlotSet(LAST_CONTEXT_SLOT, None),
-            ]
-            events.append(FollowupAction("action_listen"))
-            return events
-
-        lines: List[str] = [to_unicode_bold("Ultimi match registrati:") ]
-        if filters_desc:
-            lines.append("Filtri attivi: " + ", ".join(filters_desc))
-        lines.append("")
-        for row in rows:
-            info = get_match_display_info(row, cursor)
-            lines.append(
+            return result_slot_events(year=year_filter, surface=surface_filter)
+
+        names = joined_player_names(rows)
+        lines: List[str] = [
+            BOLD_LABELS["Ultimi match registrati:"],
+            *filter_header_lines(filters_desc),
+            "",
+            *[
                 f"- {info.get('tournament', 'N/A')} ({info.get('year', 'N/A')}) - "
                 f"{info.get('winner', 'N/A')} bt {info.get('loser', 'N/A')} "
                 f"{info.get('score') or 'N/A'} ({info.get('round') or 'N/A'})"
-            )
-
-        dispatcher.utter_message(text="\n".join(lines))
-        events = [
-            SlotSet("player_name", None),
-            SlotSet("player1", None),
-            SlotSet("player2", None),
-            SlotSet("tournament_name", None),
-            SlotSet("year", year_filter if year_filter else None),
-            SlotSet("surface", surface_filter if surface_filter else None),
-            SlotSet(LAST_CONTEXT_SLOT, self.name()),
+                for info in [get_match_display_info(row, names) for row in rows]
+            ],
         ]
-        events.append(FollowupAction("action_listen"))
-        return events
+        dispatcher.utter_message(text="\n".join(lines))
+        return result_slot_events(self.name(), year=year_filter, surface=surface_filter)
 
 
 class ActionOngoingTournaments(Action):
@@ -2379,70 +2895,39 @@ class ActionOngoingTournaments(Action):
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
-        conn: Optional[sqlite3.Connection] = None
         try:
-            conn = get_db_connection()
-            cur = conn.cursor()
-            cur.execute(
-                """
-                SELECT *
-                FROM matches
-                WHERE ongoing = 1
-                ORDER BY tourney_date DESC, match_id DESC
-                LIMIT 200
-                """
-            )
-            rows = cur.fetchall()
-
-            if not rows:
-                dispatcher.utter_message(text="Al momento non risultano match in corso nel database.")
-                return [
-                    SlotSet("player_name", None),
-                    SlotSet("player1", None),
-                    SlotSet("player2", None),
-                    SlotSet("tournament_name", None),
-                    SlotSet("year", None),
-                    SlotSet("surface", None),
-                    SlotSet(LAST_CONTEXT_SLOT, None),
-                    FollowupAction("action_listen"),
-                ]
-
-            lines: List[str] = [to_unicode_bold("Tornei in corso:")]
-            per_tournament: Dict[str, List[Tuple[Any, ...]]] = {}
-            for raw in rows:
-                tourney = raw[1] or "Torneo sconosciuto"
-                per_tournament.setdefault(tourney, []).append(raw)
-
-            for tourney_name, matches in per_tournament.items():
-                lines.append("")
-                lines.append(to_unicode_bold(f"{tourney_name}") + ", ultime 2 partite:")
-                subset = matches[:2]
-                for raw in subset:
-                    info = get_match_display_info(raw, cur)
-                    round_name = info.get("round") or "Round N/A"
-                    score = info.get("score") or "Aggiornamento non disponibile"
-                    lines.append(
-                        f"    - {info.get('year', 'N/A')} {round_name} - "
-                        f"{info.get('winner', 'N/A')} bt {info.get('loser', 'N/A')} {score}"
-                    )
-
-            dispatcher.utter_message(text="\n".join(lines))
-            return [
-                SlotSet("player_name", None),
-                SlotSet("player1", None),
-                SlotSet("player2", None),
-                SlotSet("tournament_name", None),
-                SlotSet("year", None),
-                SlotSet("surface", None),
-                SlotSet(LAST_CONTEXT_SLOT, None),
-                FollowupAction("action_listen"),
-            ]
-        except Exception as exc:
+            with pooled_cursor() as cur:
+                cur.execute(ONGOING_MATCHES_SQL)
+                rows = cur.fetchall()
+
+                if not rows:
+                    dispatcher.utter_message(text="Al momento non risultano match in corso nel database.")
+                    return result_slot_events()
+
+                lines: List[str] = [BOLD_LABELS["Tornei in corso:"]]
+                # Al più 2 righe per torneo arrivano già dalla query; il limite resta qui perché
+                # nome vuoto e NULL finiscono entrambi sotto "Torneo sconosciuto".
+                per_tournament: Dict[str, List[sqlite3.Row]] = defaultdict(list)
+                for raw in rows:
+                    matches = per_tournament[raw["tourney_name"] or "Torneo sconosciuto"]
+                    if len(matches) < 2:
+                        matches.append(raw)
+
+                names = joined_player_names(raw for matches in per_tournament.values() for raw in matches)
+                for tourney_name, matches in per_tournament.items():
+                    lines.extend(("", to_unicode_bold(tourney_name) + ", ultime 2 partite:"))
+                    lines.extend([
+                        f"    - {info.get('year', 'N/A')} {info.get('round') or 'Round N/A'} - "
+                        f"{info.get('winner', 'N/A')} bt {info.get('loser', 'N/A')} "
+                        f"{info.get('score') or 'Aggiornamento non disponibile'}"
+                        for info in [get_match_display_info(raw, names) for raw in matches]
+                    ])
+
+                dispatcher.utter_message(text="\n".join(lines))
+                return result_slot_events()
+        except sqlite3.Error as exc:
             dispatcher.utter_message(text=f"Errore nel recuperare le partite in corso: {exc}")
             return []
-        finally:
-            if conn:
-                conn.close()
 
 
 class ActionApplyFilters(Action):
@@ -2454,22 +2939,16 @@ class ActionApplyFilters(Action):
     @staticmethod
     def _get_last_relevant_action(tracker: Tracker) -> Optional[str]:
         """Restituisce l'ultima action eseguita (escludendo listen/router)."""
-        events = getattr(tracker, "events", []) or []
-        ignored = {
-            "action_listen",
-            "action_apply_filters",
-            "action_default_fallback",
-            "action_reset_slots",
-            "action_session_start",
-            "action_extract_slots",
-        }
+        events = tracker.events
+        if not events:
+            return None
+        ignored = FILTER_IGNORED_ACTIONS
         for event in reversed(events):
-            if getattr(event, "event", None) != "action":
-                continue
-            name = getattr(event, "name", "") or ""
-            if name in ignored or name.startswith("utter_"):
+            if event_field(event, "event") != "action":
                 continue
-            return name
+            name = event_field(event, "name") or ""
+            if name not in ignored and not name.startswith("utter_"):
+                return name
         return None
 
     def run(
@@ -2484,16 +2963,12 @@ class ActionApplyFilters(Action):
         surface = ctx.message_surface
         tournament = ctx.message_tournament
 
-        last_action = self._get_last_relevant_action(tracker)
+        # Le action con risultati aggiornano LAST_CONTEXT_SLOT a ogni esecuzione: la cronologia
+        # degli eventi si scorre solo quando lo slot è vuoto.
+        last_action = tracker.get_slot(LAST_CONTEXT_SLOT)
         if not last_action:
-            last_action = tracker.get_slot(LAST_CONTEXT_SLOT)
-        allowed_actions = {
-            "action_player_stats",
-            "action_head_to_head",
-            "action_match_result",
-        }
-
-        if last_action not in allowed_actions:
+            last_action = self._get_last_relevant_action(tracker)
+        if last_action not in FILTERABLE_ACTIONS:
             # Nessuna action compatibile trovata: meglio guidare l'utente a ripetere la richiesta.
             dispatcher.utter_message(
                 text="Qui non posso applicare filtri. Prova a formulare una nuova richiesta completa."
@@ -2508,8 +2983,7 @@ class ActionApplyFilters(Action):
         if tournament:
             slot_updates.append(SlotSet("tournament_name", tournament))
 
-        slot_updates.append(SlotSet(LAST_CONTEXT_SLOT, last_action))
-        slot_updates.append(FollowupAction(last_action))
+        slot_updates.extend((SlotSet(LAST_CONTEXT_SLOT, last_action), FollowupAction(last_action)))
         return slot_updates
 
 
@@ -2525,8 +2999,7 @@ class ActionResetSlots(Action):
         tracker: Tracker,
         domain: Dict[Text, Any],
     ) -> List[Dict[Text, Any]]:
-        slots = ["player_name", "player1", "player2", "tournament_name", "year", "surface", LAST_CONTEXT_SLOT]
-        return [SlotSet(slot, None) for slot in slots]
+        return [SlotSet(slot, None) for slot in CONVERSATION_SLOTS]
 
 
 class ActionDefaultFallback(Action):
@@ -5,15 +5,96 @@ Crea e popola database SQLite per TennisBot usando dati da TennisMyLife/TML-Data
 """
 
 import sqlite3
+import numpy as np
 import pandas as pd
 import sys
+import time
+import unicodedata
 from datetime import datetime, timedelta
 from typing import Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import io
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
+# PRAGMA per il caricamento massivo: WAL + synchronous=NORMAL evitano un fsync completo a ogni
+# commit, cache e mmap ampi riducono le letture. page_size ha effetto solo su un file nuovo e
+# va impostato prima di passare a WAL.
+LOAD_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Download simultanei dei CSV annuali (le scritture sul DB restano sul thread principale).
+DOWNLOAD_WORKERS = 8
+
+# Intervallo minimo (secondi) fra due aggiornamenti della riga di avanzamento.
+PROGRESS_INTERVAL = 0.5
+
+# Righe per blocco nell'elaborazione dei CSV annuali: la memoria della conversione e delle
+# tuple da inserire resta limitata al blocco, non all'intero file.
+CSV_CHUNK_ROWS = 20000
+
+# Identificativi dei giocatori letti sempre come testo: senza tipo esplicito pandas deve
+# dedurlo scorrendo la colonna, e un file con soli id numerici li leggerebbe come float.
+CSV_ID_DTYPES = {"id": str, "winner_id": str, "loser_id": str}
+
+# Colonne di ATP_Database.csv lette da load_players_data, nell'ordine dell'INSERT in players,
+# con il tipo di conversione.
+PLAYER_CSV_COLUMNS = (
+    ("id", "str"), ("player", "str"), ("atpname", "str"), ("birthdate", "date"),
+    ("weight", "float"), ("height", "float"), ("turnedpro", "str"), ("birthplace", "str"),
+    ("coaches", "str"), ("hand", "cat"), ("backhand", "cat"), ("ioc", "cat"),
+)
+
+# Inserimento dei giocatori: un id già presente viene aggiornato sul posto (UPSERT) invece di
+# essere cancellato e reinserito come con INSERT OR REPLACE, e il flag active resta invariato.
+PLAYERS_UPSERT_SQL = """
+    INSERT INTO players 
+    (id, player_name, atpname, birthdate, weight, height, turned_pro, 
+     birthplace, coaches, hand, backhand, ioc, active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+    ON CONFLICT(id) DO UPDATE SET
+        player_name = excluded.player_name, atpname = excluded.atpname,
+        birthdate = excluded.birthdate, weight = excluded.weight, height = excluded.height,
+        turned_pro = excluded.turned_pro, birthplace = excluded.birthplace,
+        coaches = excluded.coaches, hand = excluded.hand, backhand = excluded.backhand,
+        ioc = excluded.ioc
+"""
+
+# Colonne dei CSV storici nell'ordine dell'INSERT in matches, con il tipo di conversione
+# ("str", "int", "float" o "date", come i rispettivi safe_*_convert; "cat" è "str" per colonne
+# con pochi valori distinti, convertiti una volta sola).
+MATCH_CSV_COLUMNS = (
+    ("tourney_name", "cat"), ("surface", "cat"), ("draw_size", "int"), ("tourney_level", "cat"),
+    ("tourney_date", "date"), ("match_num", "int"), ("winner_id", "str"), ("loser_id", "str"),
+    ("winner_seed", "cat"), ("loser_seed", "cat"), ("score", "str"), ("best_of", "int"),
+    ("round", "cat"), ("minutes", "int"),
+) + tuple(
+    (f"{side}_{stat}", "int")
+    for side in ("w", "l")
+    for stat in ("ace", "df", "svpt", "1stIn", "1stWon", "2ndWon", "SvGms", "bpSaved", "bpFaced")
+)
+
+# Elenco delle colonne di MATCH_CSV_COLUMNS, condiviso dalle istruzioni SQL su matches.
+MATCH_COLUMNS_SQL = ", ".join(name for name, _ in MATCH_CSV_COLUMNS)
+
+# INSERT dei match storici: stringa costante, quindi lo statement preparato resta nella cache
+# della connessione fra un executemany e l'altro.
+MATCHES_INSERT_SQL = (
+    f"INSERT INTO matches ({MATCH_COLUMNS_SQL}, ongoing) "
+    f"VALUES ({', '.join('?' * len(MATCH_CSV_COLUMNS))}, 0)"
+)
+
+
 class TennisBotDatabaseCreator:
     """Classe per creare e popolare il database TennisBot."""
     
@@ -21,11 +102,24 @@ class TennisBotDatabaseCreator:
         self.db_path = db_path
         self.conn: Optional[sqlite3.Connection] = None
         self.base_url = "https://raw.githubusercontent.com/TennisMyLife/TML-Database/master"
+        # Sessione condivisa: connessioni keep-alive riusate fra i download (un pool per worker)
+        # e nuovi tentativi automatici sugli errori di rete o 5xx transitori.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=DOWNLOAD_WORKERS,
+            pool_maxsize=DOWNLOAD_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504)),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._last_progress = 0.0
         
     def connect_database(self) -> None:
         """Stabilisce la connessione al database SQLite."""
         try:
             self.conn = sqlite3.connect(self.db_path)
+            for pragma in LOAD_PRAGMAS:
+                self.conn.execute(pragma)
             self.conn.execute("PRAGMA foreign_keys = ON")
             print(f"Connessione al database '{self.db_path}' stabilita")
         except sqlite3.Error as e:
@@ -62,7 +156,7 @@ class TennisBotDatabaseCreator:
             # Tabella matches (con dati del torneo integrati)
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS matches (
-                    match_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    match_id INTEGER PRIMARY KEY,
                     tourney_name TEXT NOT NULL,
                     surface TEXT,
                     draw_size INTEGER,
@@ -107,29 +201,110 @@ class TennisBotDatabaseCreator:
         except sqlite3.Error as e:
             print(f"Errore nella creazione delle tabelle: {e}")
             raise
-    
-    def download_csv_data(self, filename: str) -> Optional[pd.DataFrame]:
-        """Scarica e legge un file CSV dal repository GitHub."""
+
+    def create_indexes(self) -> None:
+        """Crea gli indici usati dalle query del bot (idempotente, anche su DB esistenti)."""
+        if not self.conn:
+            raise RuntimeError("Connessione al database non stabilita")
+
+        try:
+            cursor = self.conn.cursor()
+
+            # Ricerca dei match di un giocatore e della sua ultima partita
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_winner ON matches(winner_id, tourney_date DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_matches_loser ON matches(loser_id, tourney_date DESC)")
+            # Head-to-head: entrambe le metà di (winner_id = ? AND loser_id = ?) OR (...) in una sola ricerca
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_matches_pair ON matches(winner_id, loser_id, tourney_date DESC)"
+            )
+
+            # Ultimi match del circuito: ORDER BY tourney_date DESC, match_id DESC ... LIMIT senza ordinamento
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_matches_date ON matches(tourney_date DESC, match_id DESC)"
+            )
+
+            # Match in corso: indice parziale (poche righe) già ordinato per la finestra
+            # PARTITION BY tourney_name ORDER BY tourney_date DESC, match_id DESC
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_matches_ongoing "
+                "ON matches(tourney_name, tourney_date DESC, match_id DESC) WHERE ongoing = 1"
+            )
+
+            # Ricerca case-insensitive del nome giocatore
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_players_name_lower ON players(LOWER(player_name))")
+
+            # Confronti `tourney_name = ? COLLATE NOCASE` (campione, ultima edizione di un torneo)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_matches_tname_nocase "
+                "ON matches(tourney_name COLLATE NOCASE, tourney_date DESC)"
+            )
+
+            self.conn.commit()
+            print("Indici creati con successo")
+
+        except sqlite3.Error as e:
+            print(f"Errore nella creazione degli indici: {e}")
+            raise
+
+    def print_progress(self, message: str, final: bool = False) -> None:
+        """Riscrive la riga di avanzamento al più ogni PROGRESS_INTERVAL secondi; con `final` la
+        scrive sempre e va a capo."""
+        now = time.monotonic()
+        if not final and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        print(f"\r{message}" + " " * 20, end="\n" if final else "", flush=True)
+
+    def download_csv_data(self, filename: str, chunksize: Optional[int] = None):
+        """Scarica e legge un file CSV dal repository GitHub.
+
+        Con `chunksize` restituisce la lista dei blocchi di al più `chunksize` righe. Il file è
+        comunque letto per intero qui (nel worker, in parallelo agli altri download), così i tipi
+        dedotti da pandas sono quelli dell'intero file e gli errori di parsing emergono subito.
+        """
         url = f"{self.base_url}/{filename}"
         try:
-            response = requests.get(url, timeout=30)
+            response = self.session.get(url, timeout=30)
             response.raise_for_status()
             
-            csv_data = io.StringIO(response.text)
-            df = pd.read_csv(csv_data)
+            # I byte vanno direttamente al parser C: nessuna copia decodificata in str e poi in StringIO
+            df = pd.read_csv(io.BytesIO(response.content), dtype=CSV_ID_DTYPES)
             df = df.where(pd.notnull(df), None)
             
             print(f"Scaricato {filename}: {len(df)} righe")
+            if chunksize:
+                return [df.iloc[start:start + chunksize] for start in range(0, len(df), chunksize)]
             return df
             
         except Exception as e:
             print(f"Errore nel download di {filename}: {e}")
             return None
     
+    def download_csv_files(self, filenames, chunksize: Optional[int] = None):
+        """Scarica i CSV in parallelo e li restituisce come coppie (nome, DataFrame) nell'ordine dato.
+
+        `chunksize` è passato a `download_csv_data`: il secondo elemento diventa la lista dei blocchi.
+
+        Al più DOWNLOAD_WORKERS download sono in corso o in attesa di essere consumati,
+        così la memoria resta limitata anche se l'inserimento è più lento della rete.
+        """
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            pending = deque()
+            for filename in filenames:
+                pending.append((filename, executor.submit(self.download_csv_data, filename, chunksize)))
+                if len(pending) >= DOWNLOAD_WORKERS:
+                    done_name, future = pending.popleft()
+                    yield done_name, future.result()
+            while pending:
+                done_name, future = pending.popleft()
+                yield done_name, future.result()
+
+    # Nei safe_*_convert il controllo dei mancanti è in linea: None per identità e NaN come unico
+    # valore diverso da sé stesso, senza una chiamata a pd.isna per ogni cella.
     def safe_int_convert(self, value) -> Optional[int]:
         """Converte un valore in intero gestendo NaN e valori non validi."""
         try:
-            if pd.isna(value) or value is None or value == '' or str(value).strip() == '':
+            if value is None or value != value or value == '' or str(value).strip() == '':
                 return None
             return int(float(str(value)))
         except (ValueError, TypeError):
@@ -138,7 +313,7 @@ class TennisBotDatabaseCreator:
     def safe_float_convert(self, value) -> Optional[float]:
         """Converte un valore in float gestendo NaN e valori non validi."""
         try:
-            if pd.isna(value) or value is None or value == '' or str(value).strip() == '':
+            if value is None or value != value or value == '' or str(value).strip() == '':
                 return None
             return float(str(value))
         except (ValueError, TypeError):
@@ -146,14 +321,14 @@ class TennisBotDatabaseCreator:
     
     def safe_str_convert(self, value) -> Optional[str]:
         """Converte un valore in stringa gestendo NaN e valori vuoti."""
-        if pd.isna(value) or value is None or str(value).strip() == '':
+        if value is None or value != value or str(value).strip() == '':
             return None
         return str(value).strip()
     
     def safe_date_convert(self, value) -> Optional[str]:
         """Converte un valore di data in stringa formato YYYYMMDD gestendo NaN e valori non validi."""
         try:
-            if pd.isna(value) or value is None or value == '' or str(value).strip() == '':
+            if value is None or value != value or value == '' or str(value).strip() == '':
                 return None
             # Converti prima in int per rimuovere il .0, poi in stringa
             date_int = int(float(str(value)))
@@ -165,6 +340,67 @@ class TennisBotDatabaseCreator:
         except (ValueError, TypeError):
             return None
     
+    @staticmethod
+    def str_column(series: pd.Series) -> np.ndarray:
+        """Versione per colonna di `safe_str_convert`: stringhe senza spazi esterni, None se vuote o NaN."""
+        values = np.full(len(series), None, dtype=object)
+        present = series.notna().to_numpy()
+        if present.any():
+            text = series[present].astype(str).str.strip().to_numpy(dtype=object)
+            values[present] = np.where(text == "", None, text)
+        return values
+
+    @staticmethod
+    def category_column(series: pd.Series) -> np.ndarray:
+        """Come `str_column` per colonne ripetitive: ogni valore distinto è convertito una volta e le
+        righe condividono lo stesso oggetto str."""
+        categorical = pd.Categorical(series)
+        labels = pd.Index(categorical.categories).astype(str).str.strip().to_numpy(dtype=object)
+        # In coda None per il codice -1 (valore mancante)
+        pool = np.append(np.where(labels == "", None, labels), None)
+        return pool[categorical.codes]
+
+    @staticmethod
+    def int_column(series: pd.Series) -> np.ndarray:
+        """Versione per colonna di `safe_int_convert`: interi troncati, None se non numerici."""
+        numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        values = np.full(len(numbers), None, dtype=object)
+        valid = np.isfinite(numbers)
+        values[valid] = numbers[valid].astype(np.int64)
+        return values
+
+    @staticmethod
+    def float_column(series: pd.Series) -> np.ndarray:
+        """Versione per colonna di `safe_float_convert`: float, None se non numerici."""
+        numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        values = np.full(len(numbers), None, dtype=object)
+        valid = ~np.isnan(numbers)
+        values[valid] = numbers[valid]
+        return values
+
+    @staticmethod
+    def date_column(series: pd.Series) -> np.ndarray:
+        """Versione per colonna di `safe_date_convert`: stringhe YYYYMMDD, None se non valide."""
+        numbers = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        values = np.full(len(numbers), None, dtype=object)
+        positions = np.flatnonzero(np.isfinite(numbers))
+        dates = numbers[positions].astype(np.int64)
+        eight_digits = (dates >= 10_000_000) & (dates <= 99_999_999)
+        values[positions[eight_digits]] = dates[eight_digits].astype(str).astype(object)
+        return values
+
+    def convert_columns(self, df: pd.DataFrame, columns) -> list:
+        """Converte le colonne indicate come coppie (nome, tipo) con le varianti vettoriali dei safe_*.
+
+        Le colonne assenti dal CSV diventano interamente None, come `row.get(...)`.
+        """
+        converters = {
+            "str": self.str_column, "cat": self.category_column, "int": self.int_column,
+            "float": self.float_column, "date": self.date_column,
+        }
+        frame = df.reindex(columns=[name for name, _ in columns])
+        return [converters[kind](frame[name]) for name, kind in columns]
+
     def load_players_data(self) -> None:
         """Carica i dati dei giocatori dalla tabella ATP_Database.csv."""
         print("\nCaricamento dati giocatori...")
@@ -176,70 +412,36 @@ class TennisBotDatabaseCreator:
         
         try:
             cursor = self.conn.cursor()
-            inserted_count = 0
-            skipped_count = 0
+            # Un'unica transazione per tutto il caricamento: i batch limitano solo la memoria
+            cursor.execute("BEGIN")
             batch_size = 1000
-            players_batch = []
             
-            print(f"Elaborazione di {len(df_players)} giocatori...", end='', flush=True)
+            self.print_progress(f"Elaborazione di {len(df_players)} giocatori...")
             
-            for idx, row in df_players.iterrows():
-                player_id = self.safe_str_convert(row['id'])
-                
-                if player_id is None or player_id == '':
-                    skipped_count += 1
-                    continue
-                
-                player_name = self.safe_str_convert(row['player'])
-                if player_name is None:
-                    player_name = f"Player_{player_id}"
-                
-                # Converte tutti gli altri campi gestendo NaN/None
-                atpname = self.safe_str_convert(row['atpname'])
-                birthdate = self.safe_date_convert(row['birthdate'])
-                weight = self.safe_float_convert(row['weight'])
-                height = self.safe_float_convert(row['height']) 
-                turned_pro = self.safe_str_convert(row['turnedpro'])
-                birthplace = self.safe_str_convert(row['birthplace'])
-                coaches = self.safe_str_convert(row['coaches'])
-                hand = self.safe_str_convert(row['hand'])
-                backhand = self.safe_str_convert(row['backhand'])
-                ioc = self.safe_str_convert(row['ioc'])
-                
-                players_batch.append((
-                    player_id, player_name, atpname, birthdate,
-                    weight, height, turned_pro, birthplace,
-                    coaches, hand, backhand, ioc
-                ))
-                inserted_count += 1
-                
-                # Commit batch ogni 1000 record
-                if len(players_batch) >= batch_size:
-                    cursor.executemany("""
-                        INSERT OR REPLACE INTO players 
-                        (id, player_name, atpname, birthdate, weight, height, turned_pro, 
-                         birthplace, coaches, hand, backhand, ioc, active)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                    """, players_batch)
-                    self.conn.commit()
-                    players_batch = []
-                    print(f"\rElaborati {inserted_count}/{len(df_players)} giocatori...", end='', flush=True)
-            
-            # Inserisci i record rimanenti
-            if players_batch:
-                cursor.executemany("""
-                    INSERT OR REPLACE INTO players 
-                    (id, player_name, atpname, birthdate, weight, height, turned_pro, 
-                     birthplace, coaches, hand, backhand, ioc, active)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                """, players_batch)
-                self.conn.commit()
-            
-            print(f"\rInseriti {inserted_count} giocatori" + " " * 30)
+            # Conversione per colonna, poi un'unica selezione delle righe con id valido
+            columns = self.convert_columns(df_players, PLAYER_CSV_COLUMNS)
+            player_ids, player_names = columns[0], columns[1]
+            valid = pd.notna(player_ids)
+            for pos in np.flatnonzero(valid & pd.isna(player_names)):
+                player_names[pos] = f"Player_{player_ids[pos]}"
+            
+            inserted_count = int(valid.sum())
+            skipped_count = len(valid) - inserted_count
+            players_rows = list(zip(*(column[valid] for column in columns)))
+            
+            # Inserimento a blocchi di 1000 record
+            for start in range(0, inserted_count, batch_size):
+                cursor.executemany(PLAYERS_UPSERT_SQL, players_rows[start:start + batch_size])
+                self.print_progress(f"Elaborati {min(start + batch_size, inserted_count)}/{len(df_players)} giocatori...")
+            
+            self.conn.commit()
+            
+            self.print_progress(f"Inseriti {inserted_count} giocatori", final=True)
             if skipped_count > 0:
                 print(f"Saltati {skipped_count} giocatori per dati non validi")
             
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"\nErrore nell'inserimento dei giocatori: {e}")
             raise
     
@@ -254,102 +456,58 @@ class TennisBotDatabaseCreator:
         
         try:
             cursor = self.conn.cursor()
+            # foreign_keys va cambiato fuori da una transazione, quindi prima del BEGIN
             cursor.execute("PRAGMA foreign_keys = OFF")
+            # Un'unica transazione per tutti gli anni: un solo commit (e fsync) a fine caricamento
+            cursor.execute("BEGIN")
             
-            matches_batch = []
             batch_size = 5000
             
-            for year_idx, year in enumerate(years, 1):
-                filename = f"{year}.csv"
-                print(f"Anno {year} ({year_idx}/{total_years})...", end='', flush=True)
-                
-                df_year = self.download_csv_data(filename)
-                
-                if df_year is None:
-                    print(f"\rAnno {year} ({year_idx}/{total_years}) - file non trovato" + " " * 30)
+            # I download degli anni successivi proseguono mentre si inserisce l'anno corrente
+            downloads = self.download_csv_files([f"{year}.csv" for year in years], CSV_CHUNK_ROWS)
+            for year_idx, (year, (_, year_chunks)) in enumerate(zip(years, downloads), 1):
+                if year_chunks is None:
+                    self.print_progress(f"Anno {year} ({year_idx}/{total_years}) - file non trovato o non leggibile", final=True)
                     continue
                 
+                # Un savepoint per anno: se un blocco non si converte si scarta solo quel file,
+                # senza lasciare nel DB le righe dei blocchi precedenti
                 year_matches = 0
-                for _, row in df_year.iterrows():
-                    winner_id = self.safe_str_convert(row['winner_id'])
-                    loser_id = self.safe_str_convert(row['loser_id'])
-                    
-                    if winner_id is None or loser_id is None:
-                        skipped_matches += 1
-                        continue
-                    
-                    matches_batch.append((
-                        self.safe_str_convert(row['tourney_name']),
-                        self.safe_str_convert(row['surface']),
-                        self.safe_int_convert(row['draw_size']),
-                        self.safe_str_convert(row['tourney_level']),
-                        self.safe_date_convert(row['tourney_date']),
-                        self.safe_int_convert(row['match_num']),
-                        winner_id, loser_id,
-                        self.safe_str_convert(row['winner_seed']),
-                        self.safe_str_convert(row['loser_seed']),
-                        self.safe_str_convert(row['score']),
-                        self.safe_int_convert(row['best_of']),
-                        self.safe_str_convert(row['round']),
-                        self.safe_int_convert(row['minutes']),
-                        self.safe_int_convert(row.get('w_ace')),
-                        self.safe_int_convert(row.get('w_df')),
-                        self.safe_int_convert(row.get('w_svpt')),
-                        self.safe_int_convert(row.get('w_1stIn')),
-                        self.safe_int_convert(row.get('w_1stWon')),
-                        self.safe_int_convert(row.get('w_2ndWon')),
-                        self.safe_int_convert(row.get('w_SvGms')),
-                        self.safe_int_convert(row.get('w_bpSaved')),
-                        self.safe_int_convert(row.get('w_bpFaced')),
-                        self.safe_int_convert(row.get('l_ace')),
-                        self.safe_int_convert(row.get('l_df')),
-                        self.safe_int_convert(row.get('l_svpt')),
-                        self.safe_int_convert(row.get('l_1stIn')),
-                        self.safe_int_convert(row.get('l_1stWon')),
-                        self.safe_int_convert(row.get('l_2ndWon')),
-                        self.safe_int_convert(row.get('l_SvGms')),
-                        self.safe_int_convert(row.get('l_bpSaved')),
-                        self.safe_int_convert(row.get('l_bpFaced'))
-                    ))
-                    matches_count += 1
-                    year_matches += 1
-                    
-                    # Commit batch ogni 5000 record
-                    if len(matches_batch) >= batch_size:
-                        cursor.executemany("""
-                            INSERT INTO matches 
-                            (tourney_name, surface, draw_size, tourney_level, tourney_date,
-                             match_num, winner_id, loser_id, winner_seed, loser_seed,
-                             score, best_of, round, minutes, w_ace, w_df, w_svpt, w_1stIn, w_1stWon, 
-                             w_2ndWon, w_SvGms, w_bpSaved, w_bpFaced, l_ace, l_df, l_svpt, l_1stIn, 
-                             l_1stWon, l_2ndWon, l_SvGms, l_bpSaved, l_bpFaced, ongoing)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                        """, matches_batch)
-                        self.conn.commit()
-                        matches_batch = []
+                year_skipped = 0
+                cursor.execute("SAVEPOINT anno")
+                try:
+                    for df_chunk in year_chunks:
+                        # Conversione per colonna (vettoriale) invece di ~30 chiamate safe_* per riga
+                        columns = self.convert_columns(df_chunk, MATCH_CSV_COLUMNS)
+                        valid = pd.notna(columns[6]) & pd.notna(columns[7])  # winner_id e loser_id
+                        chunk_matches = int(valid.sum())
+                        year_skipped += len(valid) - chunk_matches
+                        year_matches += chunk_matches
+                        
+                        chunk_rows = list(zip(*(column[valid] for column in columns)))
+                        for start in range(0, len(chunk_rows), batch_size):
+                            cursor.executemany(MATCHES_INSERT_SQL, chunk_rows[start:start + batch_size])
+                except (TypeError, ValueError) as e:
+                    cursor.execute("ROLLBACK TO anno")
+                    cursor.execute("RELEASE anno")
+                    self.print_progress(f"Anno {year} ({year_idx}/{total_years}) - file non leggibile: {e}", final=True)
+                    continue
+                cursor.execute("RELEASE anno")
+                skipped_matches += year_skipped
+                matches_count += year_matches
                 
-                print(f"\rAnno {year} ({year_idx}/{total_years}): {year_matches} partite - Totale: {matches_count:,}" + " " * 20)
-            
-            # Inserisci i record rimanenti
-            if matches_batch:
-                cursor.executemany("""
-                    INSERT INTO matches 
-                    (tourney_name, surface, draw_size, tourney_level, tourney_date,
-                     match_num, winner_id, loser_id, winner_seed, loser_seed,
-                     score, best_of, round, minutes, w_ace, w_df, w_svpt, w_1stIn, w_1stWon, 
-                     w_2ndWon, w_SvGms, w_bpSaved, w_bpFaced, l_ace, l_df, l_svpt, l_1stIn, 
-                     l_1stWon, l_2ndWon, l_SvGms, l_bpSaved, l_bpFaced, ongoing)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
-                """, matches_batch)
-                self.conn.commit()
+                self.print_progress(f"Anno {year} ({year_idx}/{total_years}): {year_matches} partite - Totale: {matches_count:,}")
+            
+            self.conn.commit()
             
             cursor.execute("PRAGMA foreign_keys = ON")
             
-            print(f"\nCaricati {matches_count:,} partite totali")
+            self.print_progress(f"Caricati {matches_count:,} partite totali", final=True)
             if skipped_matches > 0:
                 print(f"Saltati {skipped_matches} match per ID giocatori non validi")
             
         except sqlite3.Error as e:
+            self.conn.rollback()
             print(f"\nErrore nel caricamento dati storici: {e}")
             raise
     
@@ -362,96 +520,97 @@ class TennisBotDatabaseCreator:
             print("Impossibile caricare i tornei in corso")
             return
         
+        # Coppa Davis esclusa prima di qualsiasi conversione o scrittura. Il vecchio controllo
+        # ("Davis Cup" in nome.lower()) non scartava mai nulla: da qui in poi i conteggi stampati
+        # (processati, aggiunti, aggiornati) non includono più le righe di Coppa Davis.
+        if "tourney_name" in df_ongoing.columns:
+            davis_cup = (
+                df_ongoing["tourney_name"].astype("string").str.lower()
+                .str.contains("davis cup", regex=False, na=False)
+            )
+            df_ongoing = df_ongoing[~davis_cup]
+        
         try:
             cursor = self.conn.cursor()
             
-            # Reimposta a 0 solo i match attualmente segnati come ongoing
-            cursor.execute("UPDATE matches SET ongoing = 0 WHERE ongoing = 1")
-            
-            # Conta match aggiunti e aggiornati
-            matches_added = 0
-            matches_updated = 0
-            skipped_matches = 0
+            # Stessa conversione per colonna dei CSV storici; servono winner_id e loser_id
+            columns = self.convert_columns(df_ongoing, MATCH_CSV_COLUMNS)
+            valid = pd.notna(columns[6]) & pd.notna(columns[7])
+            skipped_matches = len(valid) - int(valid.sum())
+            staging_rows = list(zip(*(column[valid] for column in columns)))
+            
+            # Le righe valide passano da una tabella temporanea: tre istruzioni set-based
+            # al posto di una SELECT più un UPDATE/INSERT per ogni match in corso.
+            cursor.execute("DROP TABLE IF EXISTS temp.ongoing_staging")
+            cursor.execute(f"""
+                CREATE TEMP TABLE ongoing_staging AS
+                SELECT {MATCH_COLUMNS_SQL}, match_id
+                FROM matches WHERE 0
+            """)
+            cursor.executemany(f"""
+                INSERT INTO ongoing_staging ({MATCH_COLUMNS_SQL})
+                VALUES ({', '.join('?' * len(MATCH_CSV_COLUMNS))})
+            """, staging_rows)
+            
+            # Match già presenti (stesse chiavi identificative; match_num e round confrontati
+            # con IS, che tratta due NULL come uguali)
+            resolve_sql = """
+                UPDATE ongoing_staging SET match_id = (
+                    SELECT MIN(m.match_id) FROM matches m
+                    WHERE m.winner_id = ongoing_staging.winner_id
+                      AND m.loser_id = ongoing_staging.loser_id
+                      AND m.tourney_name = ongoing_staging.tourney_name
+                      AND m.tourney_date = ongoing_staging.tourney_date
+                      AND m.match_num IS ongoing_staging.match_num
+                      AND m.round IS ongoing_staging.round
+                )
+                WHERE match_id IS NULL
+            """
+            cursor.execute(resolve_sql)
+            cursor.execute("SELECT COUNT(*) FROM ongoing_staging WHERE match_id IS NOT NULL")
+            matches_updated = cursor.fetchone()[0]
+            
+            # Reimposta a 0 solo i match segnati come ongoing che non compaiono più nel file:
+            # quelli ancora in corso non vengono riscritti due volte (1 -> 0 -> 1)
+            cursor.execute("""
+                UPDATE matches SET ongoing = 0
+                WHERE ongoing = 1
+                  AND match_id NOT IN (SELECT match_id FROM ongoing_staging WHERE match_id IS NOT NULL)
+            """)
             
-            for _, row in df_ongoing.iterrows():
-                winner_id = self.safe_str_convert(row['winner_id'])
-                loser_id = self.safe_str_convert(row['loser_id'])
-                
-                if winner_id is None or loser_id is None:
-                    skipped_matches += 1
-                    continue
-                
-                tourney_name = self.safe_str_convert(row['tourney_name'])
-                tourney_date = self.safe_date_convert(row['tourney_date'])
-                match_num = self.safe_int_convert(row['match_num'])
-                round_val = self.safe_str_convert(row['round'])
-                
-                if tourney_name and "Davis Cup" in tourney_name.lower():
-                    continue
-                
-                # Cerca se il match esiste già (basato su chiavi identificative)
-                cursor.execute("""
-                    SELECT match_id FROM matches 
-                    WHERE winner_id = ? AND loser_id = ? AND tourney_name = ? 
-                    AND tourney_date = ? AND (match_num = ? OR (match_num IS NULL AND ? IS NULL))
-                    AND (round = ? OR (round IS NULL AND ? IS NULL))
-                """, (winner_id, loser_id, tourney_name, tourney_date, 
-                      match_num, match_num, round_val, round_val))
-                
-                existing_match = cursor.fetchone()
-                
-                if existing_match:
-                    # Match esiste: aggiorna ongoing = 1
-                    cursor.execute("""
-                        UPDATE matches
-                        SET ongoing = 1, score = COALESCE(?, score)
-                        WHERE match_id = ?
-                    """, (self.safe_str_convert(row['score']), existing_match[0]))
-                    matches_updated += 1
-                else:
-                    # Match non esiste: inseriscilo con ongoing = 1
-                    cursor.execute("""
-                        INSERT INTO matches 
-                        (tourney_name, surface, draw_size, tourney_level, tourney_date,
-                         match_num, winner_id, loser_id, winner_seed, loser_seed,
-                         score, best_of, round, minutes, w_ace, w_df, w_svpt, w_1stIn, w_1stWon, 
-                         w_2ndWon, w_SvGms, w_bpSaved, w_bpFaced, l_ace, l_df, l_svpt, l_1stIn, 
-                         l_1stWon, l_2ndWon, l_SvGms, l_bpSaved, l_bpFaced, ongoing)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-                    """, (
-                        tourney_name,
-                        self.safe_str_convert(row['surface']),
-                        self.safe_int_convert(row['draw_size']),
-                        self.safe_str_convert(row['tourney_level']),
-                        tourney_date,
-                        match_num,
-                        winner_id, loser_id,
-                        self.safe_str_convert(row['winner_seed']),
-                        self.safe_str_convert(row['loser_seed']),
-                        self.safe_str_convert(row['score']),
-                        self.safe_int_convert(row['best_of']),
-                        round_val,
-                        self.safe_int_convert(row['minutes']),
-                        self.safe_int_convert(row.get('w_ace')),
-                        self.safe_int_convert(row.get('w_df')),
-                        self.safe_int_convert(row.get('w_svpt')),
-                        self.safe_int_convert(row.get('w_1stIn')),
-                        self.safe_int_convert(row.get('w_1stWon')),
-                        self.safe_int_convert(row.get('w_2ndWon')),
-                        self.safe_int_convert(row.get('w_SvGms')),
-                        self.safe_int_convert(row.get('w_bpSaved')),
-                        self.safe_int_convert(row.get('w_bpFaced')),
-                        self.safe_int_convert(row.get('l_ace')),
-                        self.safe_int_convert(row.get('l_df')),
-                        self.safe_int_convert(row.get('l_svpt')),
-                        self.safe_int_convert(row.get('l_1stIn')),
-                        self.safe_int_convert(row.get('l_1stWon')),
-                        self.safe_int_convert(row.get('l_2ndWon')),
-                        self.safe_int_convert(row.get('l_SvGms')),
-                        self.safe_int_convert(row.get('l_bpSaved')),
-                        self.safe_int_convert(row.get('l_bpFaced'))
-                    ))
-                    matches_added += 1
+            # Match nuovi: inseriti con ongoing = 1, una sola volta per chiave (la prima riga)
+            cursor.execute(f"""
+                INSERT INTO matches ({MATCH_COLUMNS_SQL}, ongoing)
+                SELECT {MATCH_COLUMNS_SQL}, 1
+                FROM ongoing_staging s
+                WHERE s.match_id IS NULL AND s.rowid = (
+                    SELECT MIN(d.rowid) FROM ongoing_staging d
+                    WHERE d.match_id IS NULL
+                      AND d.winner_id = s.winner_id AND d.loser_id = s.loser_id
+                      AND d.tourney_name IS s.tourney_name AND d.tourney_date IS s.tourney_date
+                      AND d.match_num IS s.match_num AND d.round IS s.round
+                )
+                ORDER BY s.rowid
+            """)
+            matches_added = cursor.rowcount
+            # Le righe appena inserite ricevono il loro match_id, così anche le loro ripetizioni
+            # successive nel file passano dall'aggiornamento del punteggio qui sotto
+            cursor.execute(resolve_sql)
+            
+            # Match nel file: ongoing = 1 e, se presente, l'ultimo punteggio ricevuto.
+            # Le righe già aggiornate non soddisfano il WHERE e non vengono scritte.
+            new_score = """COALESCE((
+                    SELECT s.score FROM ongoing_staging s
+                    WHERE s.match_id = matches.match_id AND s.score IS NOT NULL
+                    ORDER BY s.rowid DESC LIMIT 1
+                ), score)"""
+            cursor.execute(f"""
+                UPDATE matches
+                SET ongoing = 1, score = {new_score}
+                WHERE match_id IN (SELECT match_id FROM ongoing_staging WHERE match_id IS NOT NULL)
+                  AND (ongoing IS NOT 1 OR score IS NOT {new_score})
+            """)
+            cursor.execute("DROP TABLE temp.ongoing_staging")
             
             self.conn.commit()
             
@@ -476,19 +635,17 @@ class TennisBotDatabaseCreator:
             
             two_years_ago = (datetime.now() - timedelta(days=730)).strftime("%Y%m%d")
             
+            # Due range seek su idx_matches_date; UNION ALL evita l'ordinamento per i duplicati,
+            # che IN (...) scarta comunque.
             cursor.execute("""
                 UPDATE players 
                 SET active = 1 
                 WHERE id IN (
-                    SELECT DISTINCT winner_id 
-                    FROM matches
-                    WHERE tourney_date >= ?
-                    UNION
-                    SELECT DISTINCT loser_id 
-                    FROM matches
-                    WHERE tourney_date >= ?
+                    SELECT winner_id FROM matches WHERE tourney_date >= :d
+                    UNION ALL
+                    SELECT loser_id FROM matches WHERE tourney_date >= :d
                 )
-            """, (two_years_ago, two_years_ago))
+            """, {"d": two_years_ago})
             
             active_count = cursor.rowcount
             self.conn.commit()
@@ -498,7 +655,99 @@ class TennisBotDatabaseCreator:
         except sqlite3.Error as e:
             print(f"Errore nell'aggiornamento giocatori attivi: {e}")
             raise
-    
+
+    def create_search_indexes(self) -> None:
+        """Crea/ricostruisce gli indici FTS5 (trigram e per parola) usati per i suggerimenti sui nomi."""
+        print("\nAggiornamento indici di ricerca...")
+
+        try:
+            cursor = self.conn.cursor()
+
+            # Indice sui nomi dei giocatori (contenuto esterno: nessuna copia dei dati)
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS players_fts USING fts5(
+                    player_name, content='players', content_rowid='rowid', tokenize='trigram'
+                )
+            """)
+            cursor.execute("INSERT INTO players_fts(players_fts) VALUES ('rebuild')")
+
+            # Stessi nomi tokenizzati per parola, senza accenti, per la ricerca per prefisso
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS players_name_fts USING fts5(
+                    player_name, content='players', content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("INSERT INTO players_name_fts(players_name_fts) VALUES ('rebuild')")
+
+            # Indice sui nomi distinti dei tornei
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS tournaments_fts USING fts5(
+                    tourney_name, tokenize='trigram'
+                )
+            """)
+            cursor.execute("DELETE FROM tournaments_fts")
+            cursor.execute("""
+                INSERT INTO tournaments_fts (tourney_name)
+                SELECT DISTINCT tourney_name FROM matches WHERE tourney_name IS NOT NULL
+            """)
+
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS tournaments_name_fts USING fts5(
+                    tourney_name, tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+            cursor.execute("DELETE FROM tournaments_name_fts")
+            cursor.execute("INSERT INTO tournaments_name_fts (tourney_name) SELECT tourney_name FROM tournaments_fts")
+
+            self.conn.commit()
+            print("Indici di ricerca aggiornati")
+
+        except sqlite3.Error as e:
+            # FTS5/trigram richiede SQLite >= 3.34: senza indice il bot usa la ricerca completa
+            self.conn.rollback()
+            print(f"Indici di ricerca non disponibili: {e}")
+
+    @staticmethod
+    def normalize_player_alias(name: str) -> str:
+        """Chiave di ricerca del nome: senza accenti, minuscola, spazi compattati.
+
+        Deve coincidere con `normalize_player_alias` in actions/actions.py.
+        """
+        decomposed = unicodedata.normalize("NFKD", name)
+        stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+        return " ".join(stripped.casefold().split())
+
+    def create_player_aliases(self) -> None:
+        """Ricostruisce la tabella player_aliases (nome normalizzato -> giocatore)."""
+        print("\nAggiornamento alias giocatori...")
+
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS player_aliases (
+                    norm TEXT PRIMARY KEY,
+                    player_id TEXT NOT NULL,
+                    canonical TEXT NOT NULL
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("DELETE FROM player_aliases")
+            cursor.execute("SELECT id, player_name FROM players WHERE player_name IS NOT NULL ORDER BY rowid")
+            # A parità di chiave resta il primo giocatore inserito
+            cursor.executemany(
+                "INSERT OR IGNORE INTO player_aliases (norm, player_id, canonical) VALUES (?, ?, ?)",
+                [
+                    (self.normalize_player_alias(name), player_id, name)
+                    for player_id, name in cursor.fetchall()
+                ],
+            )
+            self.conn.commit()
+            print("Alias giocatori aggiornati")
+
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            print(f"Errore nell'aggiornamento degli alias giocatori: {e}")
+
     def get_database_stats(self) -> None:
         """Mostra statistiche del database creato."""
         print("\nStatistiche del database:")
@@ -546,6 +795,7 @@ class TennisBotDatabaseCreator:
     
     def close_connection(self) -> None:
         """Chiude la connessione al database."""
+        self.session.close()
         if self.conn:
             self.conn.close()
             print(f"\nConnessione al database chiusa")
@@ -571,8 +821,13 @@ class TennisBotDatabaseCreator:
             else:
                 print("Schema e dati già presenti, eseguo solo l'aggiornamento.")
 
+            # Indici dopo il caricamento massivo (costruiti una volta sola invece di essere
+            # aggiornati a ogni INSERT) e prima degli aggiornamenti che li usano
+            self.create_indexes()
             self.update_ongoing_matches()
             self.update_active_players()
+            self.create_search_indexes()
+            self.create_player_aliases()
             self.get_database_stats()
 
             if db_exists: